@@ -1,12 +1,119 @@
 """Configuration loading for Reclaim Agent."""
 
+import hashlib
+import json
 import os
-import yaml
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, List, Optional
-from dotenv import load_dotenv
+from typing import Dict, Any, Optional, Tuple
 
-load_dotenv()
+from .milestones import MilestoneIndex
+
+if not os.getenv("RECLAIM_NO_DOTENV"):
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+_AGENT_DIR = Path(__file__).resolve().parent.parent
+_DEFAULT_CONFIG_PATH = _AGENT_DIR / "agent_config" / "default.yaml"
+_RECLAIM_CONFIG_PATH = _AGENT_DIR / "agent_config" / "reclaim.yaml"
+# Derived files (the merged-config sidecar) live here, outside agent_config/.
+_CONFIG_CACHE_DIR = _AGENT_DIR / ".reclaim-cache" / "config"
+
+
+def _fast_clone(obj: Any) -> Any:
+    """
+    Deep-copy a parsed YAML/JSON tree.
+
+    Such trees only hold dicts, lists and immutable scalars, so this skips
+    copy.deepcopy's memo and per-type dispatch.
+    """
+    t = type(obj)
+    if t is dict:
+        return {k: _fast_clone(v) for k, v in obj.items()}
+    if t is list:
+        return [_fast_clone(v) for v in obj]
+    return obj
+
+
+# (yaml module, Loader, Dumper), imported on first use so that startups served
+# from the merged-config JSON sidecar never load PyYAML.
+_YAML: Optional[Tuple[Any, Any, Any]] = None
+
+
+def _yaml() -> Tuple[Any, Any, Any]:
+    """Import PyYAML lazily, preferring the LibYAML C loader/dumper."""
+    global _YAML
+    if _YAML is None:
+        import yaml
+
+        try:
+            from yaml import CSafeLoader as loader, CSafeDumper as dumper
+        except ImportError:  # PyYAML built without LibYAML
+            from yaml import SafeLoader as loader, SafeDumper as dumper
+        _YAML = (yaml, loader, dumper)
+    return _YAML
+
+
+# Parsed YAML keyed by path; entries are (mtime, size, data) and are reused
+# only while the file's stat still matches.
+_YAML_CACHE: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+_YAML_CACHE_MAX = 100
+# Guards _YAML_CACHE: the watchdog observer thread evicts entries concurrently.
+_YAML_CACHE_LOCK = threading.Lock()
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # optional; cache hits are then validated with stat()
+    FileSystemEventHandler = object
+    Observer = None
+
+# Directories with a running watchdog observer that evicts changed YAML files.
+_WATCHED_DIRS: Dict[str, Any] = {}
+
+
+class _YamlCacheInvalidator(FileSystemEventHandler):
+    """Evict cached YAML for any file touched inside a watched directory."""
+
+    def on_any_event(self, event) -> None:
+        for changed in (event.src_path, getattr(event, "dest_path", "")):
+            if changed:
+                with _YAML_CACHE_LOCK:
+                    _YAML_CACHE.pop(os.fsdecode(changed), None)
+
+
+def _watch_dir(directory: Path) -> bool:
+    """Ensure `directory` is watched for changes; False if watchdog is unavailable."""
+    key = str(directory)
+    if key in _WATCHED_DIRS:
+        return True
+    if Observer is None:
+        return False
+    observer = Observer()
+    observer.daemon = True
+    try:
+        observer.schedule(_YamlCacheInvalidator(), key, recursive=False)
+        observer.start()
+    except OSError:
+        return False
+    _WATCHED_DIRS[key] = observer
+    return True
+
+
+@dataclass(frozen=True, slots=True)
+class TruthCheck:
+    """A truth check command run from the app directory."""
+
+    name: str
+    command: str
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TruthCheck":
+        # A missing command fails just that check when checks run, not config loading.
+        return cls(name=data.get("name", "truth-check"), command=data.get("command", ""))
 
 
 class Config:
@@ -20,30 +127,138 @@ class Config:
         self.github_token = os.getenv("RECLAIM_GH_TOKEN", "")
         
         # Load agent config
-        agent_dir = Path(__file__).parent.parent
-        default_config_path = agent_dir / "agent_config" / "default.yaml"
-        reclaim_config_path = agent_dir / "agent_config" / "reclaim.yaml"
+        default_config_path = _DEFAULT_CONFIG_PATH
+        reclaim_config_path = _RECLAIM_CONFIG_PATH
         
-        default_config = self._load_yaml(default_config_path)
-        reclaim_config = self._load_yaml(reclaim_config_path)
+        self._default_path = default_config_path
+        self._reclaim_path = reclaim_config_path
+        # Raw reclaim.yaml contents, kept in memory for writes (loaded lazily
+        # when the merged-config sidecar lets us skip YAML on startup).
+        self._reclaim_config: Optional[Dict[str, Any]] = None
 
-        # Merge configs (reclaim overrides default) with a shallow dict + nested dict merge.
-        # Lists (e.g. truth_checks, repo_rules) are taken from reclaim_config when present.
-        self.config = self._merge_configs(default_config, reclaim_config)
-        self.truth_checks = self.config.get("truth_checks", [])
+        # Fast path: merged config persisted as JSON for the current YAML stats.
+        merged_path = self._merged_cache_path(default_config_path, reclaim_config_path)
+        merged = self._load_merged_cache(merged_path)
+        if merged is None:
+            default_config = self._load_yaml(default_config_path)
+            reclaim_config = self._load_yaml(reclaim_config_path)
+            self._reclaim_config = _fast_clone(reclaim_config)
+
+            # Merge configs (reclaim overrides default) with a shallow dict + nested dict merge.
+            # Lists (e.g. truth_checks, repo_rules) are taken from reclaim_config when present.
+            merged = self._merge_configs(default_config, reclaim_config)
+            self._write_merged_cache(merged_path, merged)
+
+        self.config = merged
+        self.truth_checks = [TruthCheck.from_dict(c) for c in self.config.get("truth_checks", [])]
         self.milestones = self.config.get("milestones") or []
         self.repo_rules = self.config.get("repo_rules", [])
         self.max_files = self.config.get("max_files", 3)
         self.max_lines = self.config.get("max_lines", 150)
         self.max_attempts = self.config.get("max_attempts", 3)
+        self._reindex_milestones()
+
+    def _reindex_milestones(self) -> None:
+        """Rebuild the milestone index (id/status lookups and the next-todo cursor)."""
+        # Shared with agent.milestones callers (runner, summary) so status
+        # changes made there keep the same index current.
+        self.milestone_index = MilestoneIndex(self.milestones)
     
     @staticmethod
     def _load_yaml(path: Path) -> Dict[str, Any]:
-        """Load YAML configuration file."""
-        if not path.exists():
+        """Load YAML configuration file (cached on mtime + size, evicted on watchdog events)."""
+        key = str(path)
+        # Watchdog events evict changed files early; hits are still checked
+        # against the file's stat in case an event is late or missed.
+        _watch_dir(path.parent)
+
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            with _YAML_CACHE_LOCK:
+                _YAML_CACHE.pop(key, None)
             return {}
+
+        with _YAML_CACHE_LOCK:
+            cached = _YAML_CACHE.get(key)
+            if cached is not None and cached[:2] == (st.st_mtime, st.st_size):
+                _YAML_CACHE.move_to_end(key)
+            else:
+                cached = None
+        if cached is not None:
+            return _fast_clone(cached[2])
+
         with open(path, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f) or {}
+            # Drive the (cached) loader class directly instead of going through yaml.load.
+            _, loader_cls, _ = _yaml()
+            loader = loader_cls(f)
+            try:
+                data = loader.get_single_data() or {}
+            finally:
+                loader.dispose()
+
+        Config._cache_yaml(path, data)
+        return _fast_clone(data)
+
+    @staticmethod
+    def _cache_yaml(path: Path, data: Dict[str, Any]) -> None:
+        """Store parsed YAML for `path` against its current stat."""
+        st = path.stat()
+        key = str(path)
+        with _YAML_CACHE_LOCK:
+            _YAML_CACHE[key] = (st.st_mtime, st.st_size, data)
+            _YAML_CACHE.move_to_end(key)
+            while len(_YAML_CACHE) > _YAML_CACHE_MAX:
+                _YAML_CACHE.popitem(last=False)
+
+    @staticmethod
+    def _merged_cache_path(default_path: Path, reclaim_path: Path) -> Path:
+        """Sidecar JSON path for the merged config, keyed by both YAML paths and stats."""
+        parts = []
+        for path in (default_path, reclaim_path):
+            try:
+                st = path.stat()
+                parts.append(f"{path}:{st.st_mtime}:{st.st_size}")
+            except FileNotFoundError:
+                parts.append(f"{path}:0:0")
+        key = hashlib.blake2b("|".join(parts).encode()).hexdigest()[:16]
+        return _CONFIG_CACHE_DIR / f"merged.{key}.json"
+
+    @staticmethod
+    def _load_merged_cache(path: Path) -> Optional[Dict[str, Any]]:
+        """Load the merged-config sidecar, or None if missing/unreadable."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data if isinstance(data, dict) else None
+
+    @staticmethod
+    def _write_merged_cache(path: Path, merged: Dict[str, Any]) -> None:
+        """Write the merged-config sidecar and drop stale ones (best effort)."""
+        try:
+            payload = json.dumps(merged, ensure_ascii=False)
+        except (TypeError, ValueError):
+            # Non-JSON YAML values (e.g. unquoted dates) - just skip the sidecar.
+            return
+        if json.loads(payload) != merged:
+            # JSON would change the config (e.g. int/bool keys become strings),
+            # so a sidecar hit wouldn't match a fresh YAML load.
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            for stale in path.parent.glob("merged.*.json"):
+                if stale != path:
+                    stale.unlink()
+            path.write_text(payload, encoding="utf-8")
+        except OSError:
+            pass
+
+    def _refresh_merged_cache(self, default_path: Path, reclaim_path: Path, reclaim_config: Dict[str, Any]) -> None:
+        """Rewrite the sidecar after reclaim.yaml has been saved."""
+        merged = self._merge_configs(self._load_yaml(default_path), reclaim_config)
+        self._write_merged_cache(self._merged_cache_path(default_path, reclaim_path), merged)
 
     @staticmethod
     def _merge_configs(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
@@ -51,34 +266,30 @@ class Config:
         Merge two config dicts where `override` wins.
 
         - For plain keys, override value replaces base.
-        - For nested dicts, merge recursively.
+        - For nested dicts, merge level by level (iteratively, into one deep copy).
         - For lists/scalars, override value replaces base.
         """
-        result: Dict[str, Any] = dict(base or {})
-        for key, val in (override or {}).items():
-            if (
-                key in result
-                and isinstance(result[key], dict)
-                and isinstance(val, dict)
-            ):
-                result[key] = Config._merge_configs(result[key], val)
-            else:
-                result[key] = val
+        result: Dict[str, Any] = _fast_clone(base or {})
+        stack = [(result, override or {})]
+        while stack:
+            dst, src = stack.pop()
+            for key, val in src.items():
+                cur = dst.get(key)
+                if isinstance(cur, dict) and isinstance(val, dict):
+                    stack.append((cur, val))
+                elif isinstance(val, (dict, list)):
+                    dst[key] = _fast_clone(val)
+                else:
+                    dst[key] = val
         return result
 
     def get_milestone_by_id(self, milestone_id: str) -> Optional[Dict[str, Any]]:
         """Get milestone by ID."""
-        for milestone in self.milestones:
-            if milestone.get("id") == milestone_id:
-                return milestone
-        return None
+        return self.milestone_index.by_id.get(milestone_id)
     
     def get_next_todo_milestone(self) -> Optional[Dict[str, Any]]:
         """Get the first milestone with status 'todo'."""
-        for milestone in self.milestones:
-            if milestone.get("status") == "todo":
-                return milestone
-        return None
+        return self.milestone_index.next_todo()
     
     def update_milestone_status(self, milestone_id: str, status: str, reason: Optional[str] = None):
         """Update milestone status in config and save to reclaim.yaml."""
@@ -86,29 +297,30 @@ class Config:
         if not milestone:
             return False
         
-        milestone["status"] = status
+        self.milestone_index.set_status(milestone, status)
         if reason:
             milestone["reason"] = reason
         
-        # Save back to reclaim.yaml
-        agent_dir = Path(__file__).parent.parent
-        reclaim_config_path = agent_dir / "agent_config" / "reclaim.yaml"
-        
-        reclaim_config = self._load_yaml(reclaim_config_path)
-        reclaim_config["milestones"] = self.milestones
-        
-        with open(reclaim_config_path, "w", encoding="utf-8") as f:
-            yaml.dump(reclaim_config, f, default_flow_style=False, sort_keys=False)
+        self._write_reclaim()
         
         return True
     
     def save(self):
         """Save current config state to reclaim.yaml."""
-        agent_dir = Path(__file__).parent.parent
-        reclaim_config_path = agent_dir / "agent_config" / "reclaim.yaml"
-        
-        reclaim_config = self._load_yaml(reclaim_config_path)
-        reclaim_config["milestones"] = self.milestones
-        
-        with open(reclaim_config_path, "w", encoding="utf-8") as f:
-            yaml.dump(reclaim_config, f, default_flow_style=False, sort_keys=False)
+        self._write_reclaim()
+
+    def _write_reclaim(self) -> None:
+        """Dump the in-memory reclaim config (with current milestones) to reclaim.yaml."""
+        if self._reclaim_config is None:
+            self._reclaim_config = self._load_yaml(self._reclaim_path)
+        self._reclaim_config["milestones"] = self.milestones
+
+        # Write to a sibling temp file and swap it in so readers never see a
+        # half-written reclaim.yaml.
+        tmp_path = self._reclaim_path.with_suffix(".yaml.tmp")
+        yaml, _, dumper = _yaml()
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            yaml.dump(self._reclaim_config, f, Dumper=dumper, default_flow_style=False, sort_keys=False)
+        os.replace(tmp_path, self._reclaim_path)
+        self._cache_yaml(self._reclaim_path, _fast_clone(self._reclaim_config))
+        self._refresh_merged_cache(self._default_path, self._reclaim_path, self._reclaim_config)
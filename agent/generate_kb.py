@@ -26,16 +26,16 @@ def main():
         if use_llm and not api_key:
             print("  (OPENAI_API_KEY not set, skipping LLM analysis)")
     
-    generator = KnowledgeBaseGenerator(
+    with KnowledgeBaseGenerator(
         repo_path,
         openai_api_key=api_key if use_llm else None,
         use_llm_analysis=use_llm and bool(api_key)
-    )
-    output_path = generator.save()
+    ) as generator:
+        output_path = generator.save()
     
-    kb_size = len(output_path.read_text(encoding='utf-8'))
+    kb_size = output_path.stat().st_size
     print(f"Knowledge base generated: {output_path}")
-    print(f"Size: {kb_size:,} characters")
+    print(f"Size: {kb_size:,} bytes")
     sys.exit(0)
 
 
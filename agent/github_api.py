@@ -1,9 +1,20 @@
 """GitHub API interactions for Reclaim Agent."""
 
-import os
-import requests
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+import asyncio
+import time
+from typing import Dict, Any, Optional, List, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+
+def _json(response: Any) -> Any:
+    """Parse a JSON response body, using orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
 
 
 class GitHubAPI:
@@ -17,16 +28,75 @@ class GitHubAPI:
             "Authorization": f"token {token}",
             "Accept": "application/vnd.github.v3+json",
         }
+        # requests (and urllib3/ssl) is only imported once a client is built.
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        # One pooled keep-alive session for all calls (avoids a TLS handshake per request).
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[502, 503, 504],
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("https://", adapter)
+        # Conditional-GET cache: (url, params) -> (ETag, parsed JSON body).
+        self._etags: Dict[Tuple[str, Tuple[Tuple[str, Any], ...]], Tuple[str, Any]] = {}
+        # Short-lived memo for polled lookups: key -> (monotonic timestamp, value).
+        self._ttl_cache: Dict[Tuple[Any, ...], Tuple[float, Any]] = {}
+        self._ttl_s = 5.0
+
+    def _ttl_get(self, key: Tuple[Any, ...]) -> Tuple[bool, Any]:
+        """Return (hit, value) for a memoized lookup younger than the TTL."""
+        entry = self._ttl_cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self._ttl_s:
+            return True, entry[1]
+        return False, None
+
+    def _ttl_put(self, key: Tuple[Any, ...], value: Any) -> None:
+        now = time.monotonic()
+        if len(self._ttl_cache) >= 64:
+            self._ttl_cache = {k: v for k, v in self._ttl_cache.items() if now - v[0] < self._ttl_s}
+        self._ttl_cache[key] = (now, value)
+
+    def _get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Tuple[int, Any]:
+        """
+        GET a JSON resource using If-None-Match.
+
+        A 304 (which GitHub does not count against the rate limit) is served from
+        the cached body and reported as 200. Returns (status_code, parsed_json_or_None).
+        """
+        key = (url, tuple(sorted((params or {}).items())))
+        etag, cached = self._etags.get(key, (None, None))
+        headers = {"If-None-Match": etag} if etag else None
+        response = self.session.get(url, params=params, headers=headers)
+        if response.status_code == 304 and etag:
+            return 200, cached
+        if response.status_code != 200:
+            return response.status_code, None
+
+        data = _json(response)
+        new_etag = response.headers.get("ETag")
+        if new_etag:
+            self._etags[key] = (new_etag, data)
+        return 200, data
     
     def create_branch(self, branch_name: str, base_branch: str) -> bool:
         """Create a new branch from base branch."""
         # Get SHA of base branch
         ref_url = f"{self.base_url}/repos/{self.repo}/git/ref/heads/{base_branch}"
-        response = requests.get(ref_url, headers=self.headers)
-        if response.status_code != 200:
+        status, ref = self._get_json(ref_url)
+        if status != 200:
             return False
         
-        sha = response.json()["object"]["sha"]
+        sha = ref["object"]["sha"]
         
         # Create new branch
         create_url = f"{self.base_url}/repos/{self.repo}/git/refs"
@@ -34,7 +104,9 @@ class GitHubAPI:
             "ref": f"refs/heads/{branch_name}",
             "sha": sha
         }
-        response = requests.post(create_url, headers=self.headers, json=data)
+        response = self.session.post(create_url, json=data)
+        if response.status_code == 201:
+            self._ttl_cache.clear()
         return response.status_code in [201, 422]  # 422 means branch already exists
     
     def create_pr(
@@ -52,20 +124,32 @@ class GitHubAPI:
             "head": head,
             "base": base
         }
-        response = requests.post(url, headers=self.headers, json=data)
+        response = self.session.post(url, json=data)
         if response.status_code == 201:
-            return response.json()
+            self._ttl_cache.clear()
+            return _json(response)
         return None
     
     def get_issue_by_title(self, title: str) -> Optional[Dict[str, Any]]:
         """Get issue by title (exact match)."""
+        # Search API returns only matching issues; it is fuzzy, so still verify the title.
+        search_url = f"{self.base_url}/search/issues"
+        query = f'repo:{self.repo} is:issue in:title "{title.replace(chr(34), " ")}"'
+        status, found = self._get_json(search_url, params={"q": query, "per_page": 10})
+        if status == 200:
+            for issue in found.get("items", []):
+                if issue["title"] == title and "pull_request" not in issue:
+                    return issue
+
+        # Fall back to listing issues whenever search has no exact hit: it may be
+        # rate limited, the index lags behind fresh issues, and fuzzy matches can
+        # push the exact title off the first page. A miss here means a duplicate.
         url = f"{self.base_url}/repos/{self.repo}/issues"
         params = {"state": "all", "per_page": 100}
-        response = requests.get(url, headers=self.headers, params=params)
-        if response.status_code != 200:
+        status, issues = self._get_json(url, params=params)
+        if status != 200:
             return None
         
-        issues = response.json()
         for issue in issues:
             if issue["title"] == title and "pull_request" not in issue:
                 return issue
@@ -85,16 +169,16 @@ class GitHubAPI:
             issue_number = existing["number"]
             url = f"{self.base_url}/repos/{self.repo}/issues/{issue_number}"
             data = {"body": body}
-            response = requests.patch(url, headers=self.headers, json=data)
+            response = self.session.patch(url, json=data)
             if response.status_code == 200:
-                return response.json()
+                return _json(response)
         else:
             # Create new issue
             url = f"{self.base_url}/repos/{self.repo}/issues"
             data = {"title": title, "body": body}
-            response = requests.post(url, headers=self.headers, json=data)
+            response = self.session.post(url, json=data)
             if response.status_code == 201:
-                return response.json()
+                return _json(response)
         
         return None
     
@@ -105,6 +189,11 @@ class GitHubAPI:
         limit: int = 5
     ) -> List[Dict[str, Any]]:
         """Get recent workflow runs."""
+        cache_key = ("workflow_runs", workflow_id, branch, limit)
+        hit, cached = self._ttl_get(cache_key)
+        if hit:
+            return cached
+
         url = f"{self.base_url}/repos/{self.repo}/actions/runs"
         params = {"per_page": limit}
         if branch:
@@ -112,27 +201,55 @@ class GitHubAPI:
         if workflow_id:
             params["workflow_id"] = workflow_id
         
-        response = requests.get(url, headers=self.headers, params=params)
-        if response.status_code == 200:
-            return response.json().get("workflow_runs", [])
+        status, runs = self._get_json(url, params=params)
+        if status == 200:
+            result = runs.get("workflow_runs", [])
+            self._ttl_put(cache_key, result)
+            return result
         return []
     
     def get_pr_by_branch(self, branch: str) -> Optional[Dict[str, Any]]:
         """Get PR by head branch name."""
+        cache_key = ("pr_by_branch", branch)
+        hit, cached = self._ttl_get(cache_key)
+        if hit:
+            return cached
+
         url = f"{self.base_url}/repos/{self.repo}/pulls"
         params = {"head": f"{self.repo.split('/')[0]}:{branch}", "state": "all"}
-        response = requests.get(url, headers=self.headers, params=params)
-        if response.status_code == 200:
-            prs = response.json()
-            if prs:
-                return prs[0]
+        status, prs = self._get_json(url, params=params)
+        if status == 200:
+            pr = prs[0] if prs else None
+            self._ttl_put(cache_key, pr)
+            return pr
         return None
 
     def get_pr_diff(self, pr_number: int) -> Optional[str]:
         """Get unified diff content for a PR."""
         url = f"{self.base_url}/repos/{self.repo}/pulls/{pr_number}"
         headers = {**self.headers, "Accept": "application/vnd.github.v3.diff"}
-        response = requests.get(url, headers=headers)
+        response = self.session.get(url, headers=headers)
         if response.status_code == 200:
             return response.text
-        return None
\ No newline at end of file
+        return None
+
+    # Async variants: run the blocking calls on worker threads sharing the pooled
+    # session, so independent lookups can be awaited together, e.g.
+    #   runs, pr, issue = await asyncio.gather(
+    #       api.aget_workflow_runs(branch=b), api.aget_pr_by_branch(b), api.aget_issue_by_title(t))
+    async def aget_workflow_runs(
+        self,
+        workflow_id: Optional[str] = None,
+        branch: Optional[str] = None,
+        limit: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Async variant of get_workflow_runs."""
+        return await asyncio.to_thread(self.get_workflow_runs, workflow_id, branch, limit)
+
+    async def aget_pr_by_branch(self, branch: str) -> Optional[Dict[str, Any]]:
+        """Async variant of get_pr_by_branch."""
+        return await asyncio.to_thread(self.get_pr_by_branch, branch)
+
+    async def aget_issue_by_title(self, title: str) -> Optional[Dict[str, Any]]:
+        """Async variant of get_issue_by_title."""
+        return await asyncio.to_thread(self.get_issue_by_title, title)
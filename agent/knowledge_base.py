@@ -8,63 +8,196 @@ Uses hybrid approach:
 - LLM analysis (gpt-4o-mini, cheap): semantic understanding of key modules
 """
 
+import hashlib
+import io
 import os
 import re
 import json
 from pathlib import Path
-from typing import Dict, List, Any, Set, Optional, Tuple
+from typing import IO, Dict, List, Any, Set, Optional, Tuple, Iterator
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+
+
+# Export/function extraction in a single pass. Each alternative consumes only
+# its keyword and captures the name in a lookahead, so overlapping hits (e.g.
+# `export function foo(` is both an export and a function) are all reported.
+# The original per-pattern scans for `export (async) function` and
+# `export const x = (...) =>` are subsumed by the `function`/`const` branches.
+# Patterns are ASCII and run on raw file bytes, so files are never decoded.
+_SOURCE_SYMBOL_RE = re.compile(
+    rb'export(?=\s+(?:default\s+)?(?:function|const|class|interface|type)\s+(?P<export_decl>\w+))'
+    rb'|export(?=\s+\{\s*(?P<export_list>[^}]+)\s*\})'
+    rb'|function(?=\s+(?P<function>\w+)\s*\()'
+    rb'|const(?=\s+(?P<const_fn>\w+)\s*[:=]\s*(?:async\s+)?\([^)]*\)\s*(?:[:=]|=>))'
+)
+_SYMBOL_KEYWORDS = (b"export", b"function", b"const")
+_SYMBOL_BUCKETS = {
+    "export_decl": "exports",
+    "export_list": "exports",
+    "function": "key_functions",
+    "const_fn": "key_functions",
+}
+
+
+def _iter_source_files(root: Path, include_ts: bool) -> Iterator[Path]:
+    """
+    Yield non-test .tsx (and optionally .ts) files under `root` in one walk.
+
+    Entries are visited in name order (files of a directory before its
+    subdirectories) so the catalog is stable across runs.
+    """
+    suffixes = (".tsx", ".ts") if include_ts else (".tsx",)
+    stack = [str(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif (
+                entry.name.endswith(suffixes)
+                and not entry.name.endswith((".test.ts", ".test.tsx"))
+                and entry.is_file()
+            ):
+                yield Path(entry.path)
+        stack.extend(reversed(subdirs))
+
+
+# Below this many files a process pool costs more to start than it saves.
+_PARALLEL_MIN_FILES = 64
+
+# Files larger than this, or named like build output, are catalogued without
+# being read or scanned.
+_MAX_ANALYZE_BYTES = 512_000
+_GENERATED_MARKERS = (".min.", ".bundle.")
+
+# Per-file analysis cache kept under <repo>/.kb_cache/. Bump the version when
+# _analyze_bytes' output changes so stale entries are discarded.
+_KB_CACHE_DIR = ".kb_cache"
+_KB_CACHE_INDEX = "cache_index.json"
+_KB_CACHE_VERSION = 3
+
+# Concurrent semantic-analysis requests to the LLM API.
+_LLM_MAX_CONCURRENCY = 4
+
+
+def _read_source(file_path_str: str) -> Optional[bytes]:
+    """Read raw file contents (None if unreadable); run on I/O threads."""
+    try:
+        with open(file_path_str, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
 
 
-class KnowledgeBaseGenerator:
-    """Generates a comprehensive knowledge base from the codebase."""
+def _analyze_file_static(file_path_str: str, repo_path_str: str, file_type: str) -> Optional[Dict[str, Any]]:
+    """
+    Analyze a single file and extract key information.
+
+    Module-level (and str-only arguments) so it can run in a process pool.
+    """
+    data = _read_source(file_path_str)
+    if data is None:
+        return None
+    return _analyze_bytes(file_path_str, data, repo_path_str, file_type)
+
+
+def _strip_repo_root(file_path_str: str, repo_path_str: str) -> Optional[str]:
+    """Repo-relative path by plain prefix strip (no syscalls), or None if not under it."""
+    if repo_path_str == ".":
+        # Relative walk from the current directory: paths are already repo-relative
+        return file_path_str
+    prefix = repo_path_str if repo_path_str.endswith(os.sep) else repo_path_str + os.sep
+    if file_path_str.startswith(prefix):
+        return file_path_str[len(prefix):]
+    return None
+
+
+def _relative_path_slow(file_path_str: str, repo_path_str: str) -> Optional[str]:
+    """Repo-relative path via resolve()/relpath, or None if it cannot be determined."""
+    file_path = Path(file_path_str)
+    # Calculate relative path from repo root using os.path.relpath (more reliable)
+    try:
+        # Convert to absolute paths
+        if file_path.is_absolute():
+            abs_file_path = file_path
+        else:
+            abs_file_path = file_path.resolve()
+        
+        abs_repo_path = Path(repo_path_str).resolve()
+        
+        # Use os.path.relpath for reliable relative path calculation
+        rel_path_str = os.path.relpath(str(abs_file_path), str(abs_repo_path))
+        rel_path = Path(rel_path_str)
+    except Exception:
+        # Fallback: extract relative path from string representation
+        file_str = str(file_path)
+        # If it contains 'app/src/', extract everything after that
+        if 'app/src/' in file_str:
+            idx = file_str.find('app/src/')
+            rel_path = Path(file_str[idx:])
+        elif file_str.startswith('app/'):
+            rel_path = Path(file_str)
+        else:
+            # Can't determine relative path, skip this file
+            return None
     
-    def __init__(self, repo_path: str, openai_api_key: Optional[str] = None, use_llm_analysis: bool = True):
-        self.repo_path = Path(repo_path)
-        self.app_path = self.repo_path / "app"
-        self.src_path = self.repo_path / "app" / "src"
-        self.openai_api_key = openai_api_key
-        self.use_llm_analysis = use_llm_analysis and openai_api_key is not None
-        
-    def generate(self) -> str:
-        """Generate the complete knowledge base markdown."""
-        sections = []
-        
-        # 1. Overview
-        sections.append(self._generate_overview())
-        
-        # 2. Architecture
-        sections.append(self._generate_architecture())
-        
-        # 3. Directory Structure
-        sections.append(self._generate_directory_structure())
-        
-        # 4. Component Catalog (organized by module)
-        sections.append(self._generate_component_catalog())
-        
-        # 5. Key Patterns and Conventions
-        sections.append(self._generate_patterns())
-        
-        # 6. Import/Export Relationships
-        sections.append(self._generate_imports_exports())
-        
-        # 7. Navigation Guide
-        sections.append(self._generate_navigation_guide())
-        
-        # 8. Common Tasks
-        sections.append(self._generate_common_tasks())
-        
-        # 9. Semantic Analysis (LLM-generated understanding of key modules)
-        if self.use_llm_analysis:
-            semantic_analysis = self._generate_semantic_analysis()
-            if semantic_analysis:
-                sections.append(semantic_analysis)
-        
-        return "\n\n".join(sections)
+    return str(rel_path)
+
+
+def _analyze_bytes(file_path_str: str, data: bytes, repo_path_str: str, file_type: str) -> Optional[Dict[str, Any]]:
+    """Extract key information from already-read file contents (CPU only, no I/O)."""
+    # Walked paths start with the repo path, so usually a prefix strip suffices
+    rel_path_str = _strip_repo_root(file_path_str, repo_path_str)
+    if rel_path_str is None:
+        rel_path_str = _relative_path_slow(file_path_str, repo_path_str)
+        if rel_path_str is None:
+            return None
+    
+    item = {
+        'name': os.path.splitext(os.path.basename(file_path_str))[0],
+        'path': rel_path_str,
+        'exports': [],
+        'key_functions': []
+    }
+    
+    # Every symbol pattern starts with one of these keywords; a substring
+    # search is far cheaper than entering the regex engine for files with none.
+    if not any(keyword in data for keyword in _SYMBOL_KEYWORDS):
+        return item
+    
+    # Extract exports and function definitions, de-duplicated in first-seen order
+    seen_exports: Set[str] = set()
+    seen_functions: Set[str] = set()
+    for match in _SOURCE_SYMBOL_RE.finditer(data):
+        kind = match.lastgroup
+        # Only the captured names are decoded
+        value = match.group(kind).decode("utf-8", "replace")
+        if _SYMBOL_BUCKETS[kind] == "exports":
+            # Handle named exports like `export { func1, func2 }`
+            for name in value.split(','):
+                name = name.strip()
+                if name not in seen_exports:
+                    seen_exports.add(name)
+                    item['exports'].append(name)
+        elif value not in seen_functions:
+            seen_functions.add(value)
+            item['key_functions'].append(value)
     
-    def _generate_overview(self) -> str:
-        """Generate overview section."""
-        return """# Reclaim Application Knowledge Base
+    item['key_functions'] = item['key_functions'][:10]  # Limit to 10
+    
+    return item
+
+
+# Static markdown sections (identical for every repository).
+_OVERVIEW_MD = """# Reclaim Application Knowledge Base
 
 ## Overview
 
@@ -102,10 +235,8 @@ app/
 └── tsconfig.json
 ```
 """
-    
-    def _generate_architecture(self) -> str:
-        """Generate architecture section."""
-        return """## Architecture
+
+_ARCHITECTURE_MD = """## Architecture
 
 ### High-Level Architecture
 
@@ -133,253 +264,8 @@ app/
 - **React Query**: Used for server state management and caching
 - **Offline Support**: Queue-based offline sync for critical operations
 """
-    
-    def _generate_directory_structure(self) -> str:
-        """Generate detailed directory structure."""
-        if not self.src_path.exists():
-            return "## Directory Structure\n\n(Unable to analyze - src path not found)"
-        
-        structure_parts = ["## Directory Structure\n"]
-        structure_parts.append("```")
-        structure_parts.append(self._build_tree(self.src_path, max_depth=4))
-        structure_parts.append("```")
-        
-        return "\n".join(structure_parts)
-    
-    def _build_tree(self, path: Path, prefix: str = "", max_depth: int = 3, current_depth: int = 0) -> str:
-        """Build a tree representation of the directory structure."""
-        if current_depth >= max_depth:
-            return ""
-        
-        lines = []
-        items = sorted([item for item in path.iterdir() if item.name != "node_modules" and not item.name.startswith(".")])
-        
-        for i, item in enumerate(items):
-            is_last = i == len(items) - 1
-            current_prefix = "└── " if is_last else "├── "
-            lines.append(f"{prefix}{current_prefix}{item.name}/" if item.is_dir() else f"{prefix}{current_prefix}{item.name}")
-            
-            if item.is_dir():
-                next_prefix = prefix + ("    " if is_last else "│   ")
-                lines.append(self._build_tree(item, next_prefix, max_depth, current_depth + 1))
-        
-        return "\n".join(lines)
-    
-    def _generate_component_catalog(self) -> str:
-        """Generate component catalog organized by module."""
-        catalog_parts = ["## Component Catalog\n"]
-        catalog_parts.append("Components organized by module/feature area.\n")
-        
-        # Analyze screens
-        screens = self._analyze_directory(self.src_path / "screens", "Screen")
-        if screens:
-            catalog_parts.append("### Screens (`app/src/screens/`)\n")
-            catalog_parts.append("Main UI pages that users navigate to.\n")
-            for screen in screens:
-                catalog_parts.append(f"- **{screen['name']}**")
-                catalog_parts.append(f"  - Path: `{screen['path']}`")
-                if screen.get('exports'):
-                    catalog_parts.append(f"  - Exports: {', '.join(screen['exports'])}")
-                catalog_parts.append("")
-        
-        # Analyze components by subdirectory
-        components_path = self.src_path / "components"
-        if components_path.exists():
-            catalog_parts.append("### Components (`app/src/components/`)\n")
-            
-            # Group by subdirectory
-            component_groups = defaultdict(list)
-            for comp in self._analyze_directory(components_path, "Component"):
-                try:
-                    comp_path_str = comp['path']
-                    # Extract group from path string (more reliable than Path operations)
-                    # Path format: app/src/components/<group>/<file> or app/src/components/<file>
-                    if '/' in comp_path_str:
-                        parts = comp_path_str.split('/')
-                        # Find 'components' index
-                        comp_idx = None
-                        for i, part in enumerate(parts):
-                            if part == 'components' and i + 1 < len(parts):
-                                comp_idx = i + 1
-                                break
-                        if comp_idx is not None and comp_idx < len(parts) - 1:
-                            # There's a subdirectory after components
-                            group = parts[comp_idx]
-                        else:
-                            group = "root"
-                    else:
-                        group = "root"
-                    component_groups[group].append(comp)
-                except Exception as e:
-                    # Debug logging (if needed, can add debug flag later)
-                    pass
-                    component_groups["root"].append(comp)
-            
-            for group, comps in sorted(component_groups.items()):
-                if group != "root":
-                    catalog_parts.append(f"#### {group.title()} Components\n")
-                for comp in comps:
-                    catalog_parts.append(f"- **{comp['name']}**")
-                    catalog_parts.append(f"  - Path: `{comp['path']}`")
-                    if comp.get('exports'):
-                        catalog_parts.append(f"  - Exports: {', '.join(comp['exports'])}")
-                    catalog_parts.append("")
-        
-        # Analyze lib modules
-        lib_path = self.src_path / "lib"
-        if lib_path.exists():
-            catalog_parts.append("### Library Modules (`app/src/lib/`)\n")
-            catalog_parts.append("Core business logic organized by domain.\n")
-            
-            # Group by subdirectory
-            lib_groups = defaultdict(list)
-            for module in self._analyze_directory(lib_path, "Module"):
-                try:
-                    mod_path = Path(module['path'])
-                    if mod_path.is_absolute():
-                        rel_path = mod_path.relative_to(lib_path.resolve())
-                    else:
-                        # Path is already relative, extract first part
-                        rel_path = mod_path
-                    group = rel_path.parts[0] if len(rel_path.parts) > 1 else "root"
-                    lib_groups[group].append(module)
-                except (ValueError, AttributeError):
-                    # Fallback: extract group from path string
-                    path_str = module['path']
-                    if '/' in path_str:
-                        # Extract lib/<group>/... from app/src/lib/<group>/...
-                        parts = path_str.split('/')
-                        lib_idx = None
-                        for i, part in enumerate(parts):
-                            if part == 'lib' and i + 1 < len(parts):
-                                lib_idx = i + 1
-                                break
-                        group = parts[lib_idx] if lib_idx is not None else "root"
-                    else:
-                        group = "root"
-                    lib_groups[group].append(module)
-            
-            for group, modules in sorted(lib_groups.items()):
-                catalog_parts.append(f"#### {group.title()} Module\n")
-                for module in modules:
-                    catalog_parts.append(f"- **{module['name']}**")
-                    catalog_parts.append(f"  - Path: `{module['path']}`")
-                    if module.get('exports'):
-                        catalog_parts.append(f"  - Exports: {', '.join(module['exports'][:5])}")  # Limit to first 5
-                        if len(module['exports']) > 5:
-                            catalog_parts.append(f"  - ... and {len(module['exports']) - 5} more")
-                    if module.get('key_functions'):
-                        catalog_parts.append(f"  - Key Functions: {', '.join(module['key_functions'][:3])}")
-                    catalog_parts.append("")
-        
-        return "\n".join(catalog_parts)
-    
-    def _analyze_directory(self, path: Path, file_type: str) -> List[Dict[str, Any]]:
-        """Analyze a directory and extract component/module information."""
-        items = []
-        
-        if not path.exists():
-            return items
-        
-        for file_path in path.rglob("*.tsx"):
-            if file_path.name.endswith(".test.tsx") or file_path.name.endswith(".test.ts"):
-                continue
-            
-            item = self._analyze_file(file_path, file_type)
-            if item:
-                items.append(item)
-        
-        # Also include .ts files for lib modules
-        if "lib" in str(path):
-            for file_path in path.rglob("*.ts"):
-                if file_path.name.endswith(".test.ts"):
-                    continue
-                if file_path not in [Path(i['path']) for i in items]:
-                    item = self._analyze_file(file_path, file_type)
-                    if item:
-                        items.append(item)
-        
-        return items
-    
-    def _analyze_file(self, file_path: Path, file_type: str) -> Optional[Dict[str, Any]]:
-        """Analyze a single file and extract key information."""
-        try:
-            content = file_path.read_text(encoding="utf-8")
-        except Exception:
-            return None
-        
-        # Calculate relative path from repo root using os.path.relpath (more reliable)
-        import os
-        try:
-            # Convert to absolute paths
-            if file_path.is_absolute():
-                abs_file_path = file_path
-            else:
-                abs_file_path = file_path.resolve()
-            
-            abs_repo_path = self.repo_path.resolve()
-            
-            # Use os.path.relpath for reliable relative path calculation
-            rel_path_str = os.path.relpath(str(abs_file_path), str(abs_repo_path))
-            rel_path = Path(rel_path_str)
-        except Exception:
-            # Fallback: extract relative path from string representation
-            file_str = str(file_path)
-            # If it contains 'app/src/', extract everything after that
-            if 'app/src/' in file_str:
-                idx = file_str.find('app/src/')
-                rel_path = Path(file_str[idx:])
-            elif file_str.startswith('app/'):
-                rel_path = Path(file_str)
-            else:
-                # Can't determine relative path, skip this file
-                return None
-        
-        item = {
-            'name': file_path.stem,
-            'path': str(rel_path),
-            'exports': [],
-            'key_functions': []
-        }
-        
-        # Extract exports
-        export_patterns = [
-            r'export\s+(?:default\s+)?(?:function|const|class|interface|type)\s+(\w+)',
-            r'export\s+\{\s*([^}]+)\s*\}',
-        ]
-        
-        for pattern in export_patterns:
-            matches = re.findall(pattern, content)
-            for match in matches:
-                if isinstance(match, str):
-                    # Handle named exports like `export { func1, func2 }`
-                    exports = [e.strip() for e in match.split(',')]
-                    item['exports'].extend(exports)
-                else:
-                    item['exports'].append(match)
-        
-        # Extract function definitions with more context
-        func_patterns = [
-            r'(?:export\s+)?(?:async\s+)?function\s+(\w+)\s*\(',
-            r'const\s+(\w+)\s*[:=]\s*(?:async\s+)?\([^)]*\)\s*(?:[:=]|=>)',
-            r'export\s+const\s+(\w+)\s*=\s*(?:async\s+)?\([^)]*\)\s*(?:[:=]|=>)',
-            r'export\s+(?:async\s+)?function\s+(\w+)\s*\(',
-        ]
-        for pattern in func_patterns:
-            func_matches = re.findall(pattern, content)
-            for func_name in func_matches:
-                if func_name and func_name not in item['key_functions']:
-                    item['key_functions'].append(func_name)
-        
-        # Remove duplicates
-        item['exports'] = list(set(item['exports']))
-        item['key_functions'] = list(set(item['key_functions']))[:10]  # Limit to 10
-        
-        return item
-    
-    def _generate_patterns(self) -> str:
-        """Generate patterns and conventions section."""
-        return """## Key Patterns and Conventions
+
+_PATTERNS_MD = """## Key Patterns and Conventions
 
 ### File Naming
 - **Screens**: `*Screen.tsx` (e.g., `TrainingScreen.tsx`)
@@ -413,10 +299,8 @@ app/
 - Test files: `*.test.ts` or `*.test.tsx`
 - Located in `__tests__/` directories or alongside source files
 """
-    
-    def _generate_imports_exports(self) -> str:
-        """Generate import/export relationships."""
-        return """## Import/Export Relationships
+
+_IMPORTS_EXPORTS_MD = """## Import/Export Relationships
 
 ### Key Entry Points
 
@@ -449,10 +333,8 @@ app/
 - `react-native-paper` - UI components
 - `@tanstack/react-query` - Data fetching
 """
-    
-    def _generate_navigation_guide(self) -> str:
-        """Generate navigation guide for common tasks."""
-        return """## Navigation Guide
+
+_NAVIGATION_GUIDE_MD = """## Navigation Guide
 
 ### How to Find Things
 
@@ -491,10 +373,8 @@ app/
 - **Insights**: `app/src/lib/insights/`
 - **Theme**: `app/src/theme/` (if exists)
 """
-    
-    def _generate_common_tasks(self) -> str:
-        """Generate common tasks guide."""
-        return """## Common Tasks and How to Accomplish Them
+
+_COMMON_TASKS_MD = """## Common Tasks and How to Accomplish Them
 
 ### Adding a New Screen
 1. Create file in `app/src/screens/` or `app/src/screens/<feature>/`
@@ -531,6 +411,327 @@ app/
 2. Run: `cd app && npx vitest run --passWithNoTests` (Unit tests)
 3. Fix any type errors or test failures
 """
+
+
+class KnowledgeBaseGenerator:
+    """Generates a comprehensive knowledge base from the codebase."""
+    
+    def __init__(self, repo_path: str, openai_api_key: Optional[str] = None, use_llm_analysis: bool = True):
+        self.repo_path = Path(repo_path)
+        self.app_path = self.repo_path / "app"
+        self.src_path = self.repo_path / "app" / "src"
+        self.openai_api_key = openai_api_key
+        self.use_llm_analysis = use_llm_analysis and openai_api_key is not None
+        # The environment does not change during a run; read AGENT_DEBUG once.
+        self._debug = os.getenv("AGENT_DEBUG", "").strip().lower() in ("1", "true", "yes")
+        self._cache_dir = self.repo_path / _KB_CACHE_DIR
+        # rel_path -> {"mtime_ns", "size", "sha256", "analysis"}; loaded on first use.
+        self._cache_index: Optional[Dict[str, Dict[str, Any]]] = None
+        self._cache_seen: Set[str] = set()
+        # Pooled keep-alive session for LLM calls, created on first use.
+        self._http: Any = None
+    
+    def __enter__(self) -> "KnowledgeBaseGenerator":
+        return self
+    
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Release the pooled HTTP session, if one was opened."""
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+    
+    def _http_session(self) -> Any:
+        """Return the shared requests session (imports requests lazily)."""
+        if self._http is None:
+            import requests
+            
+            session = requests.Session()
+            session.headers.update({
+                "Authorization": f"Bearer {self.openai_api_key}",
+                "Content-Type": "application/json",
+            })
+            self._http = session
+        return self._http
+        
+    def generate(self) -> str:
+        """Generate the complete knowledge base markdown."""
+        buf = io.StringIO()
+        self.write(buf)
+        return buf.getvalue()
+    
+    def write(self, out: IO[str]) -> None:
+        """Stream the complete knowledge base markdown to `out`."""
+        # 1. Overview
+        out.write(_OVERVIEW_MD)
+        
+        # 2. Architecture
+        out.write("\n\n")
+        out.write(_ARCHITECTURE_MD)
+        
+        # 3. Directory Structure
+        out.write("\n\n")
+        self._write_directory_structure(out)
+        
+        # 4. Component Catalog (organized by module)
+        out.write("\n\n")
+        self._write_component_catalog(out)
+        
+        # 5. Key Patterns and Conventions
+        out.write("\n\n")
+        out.write(_PATTERNS_MD)
+        
+        # 6. Import/Export Relationships
+        out.write("\n\n")
+        out.write(_IMPORTS_EXPORTS_MD)
+        
+        # 7. Navigation Guide
+        out.write("\n\n")
+        out.write(_NAVIGATION_GUIDE_MD)
+        
+        # 8. Common Tasks
+        out.write("\n\n")
+        out.write(_COMMON_TASKS_MD)
+        
+        # 9. Semantic Analysis (LLM-generated understanding of key modules)
+        if self.use_llm_analysis:
+            semantic_analysis = self._generate_semantic_analysis()
+            if semantic_analysis:
+                out.write("\n\n")
+                out.write(semantic_analysis)
+        
+        self._save_cache_index()
+    
+    def _load_cache_index(self) -> Dict[str, Dict[str, Any]]:
+        """Load the per-file analysis cache index (empty if missing or stale)."""
+        if self._cache_index is None:
+            self._cache_index = {}
+            try:
+                with open(self._cache_dir / _KB_CACHE_INDEX, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict) and data.get("version") == _KB_CACHE_VERSION:
+                    self._cache_index = data.get("files", {})
+            except (OSError, ValueError):
+                pass
+        return self._cache_index
+    
+    def _save_cache_index(self) -> None:
+        """Atomically rewrite the cache index, keeping only files seen this run."""
+        if self._cache_index is None:
+            return
+        files = {k: v for k, v in self._cache_index.items() if k in self._cache_seen}
+        try:
+            self._cache_dir.mkdir(exist_ok=True)
+            # Keep the cache out of the target repo's commits (the agent runs `git add -A`).
+            gitignore = self._cache_dir / ".gitignore"
+            if not gitignore.exists():
+                gitignore.write_text("*\n", encoding="utf-8")
+            tmp_path = self._cache_dir / (_KB_CACHE_INDEX + ".tmp")
+            tmp_path.write_text(json.dumps({"version": _KB_CACHE_VERSION, "files": files}), encoding="utf-8")
+            os.replace(tmp_path, self._cache_dir / _KB_CACHE_INDEX)
+        except OSError:
+            pass
+    
+    def _write_directory_structure(self, out: IO[str]) -> None:
+        """Write detailed directory structure."""
+        if not self.src_path.exists():
+            out.write("## Directory Structure\n\n(Unable to analyze - src path not found)")
+            return
+        
+        out.write("## Directory Structure\n\n```\n")
+        self._write_tree(out, self.src_path, max_depth=4)
+        out.write("\n```")
+    
+    def _write_tree(self, out: IO[str], path: Path, max_depth: int = 3) -> None:
+        """Write a tree representation of the directory structure."""
+        # Explicit stack of pending output: literal text, or (dir, prefix, depth)
+        # still to be expanded. Children are pushed in reverse so output stays
+        # left-to-right without recursion.
+        stack: List[Any] = [(str(path), "", 0)]
+        while stack:
+            top = stack.pop()
+            if isinstance(top, str):
+                out.write(top)
+                continue
+            dir_path, prefix, depth = top
+            if depth >= max_depth:
+                continue
+            
+            with os.scandir(dir_path) as it:
+                items = sorted(
+                    (e for e in it if e.name != "node_modules" and not e.name.startswith(".")),
+                    key=lambda e: e.name,
+                )
+            
+            pending: List[Any] = []
+            for i, item in enumerate(items):
+                is_last = i == len(items) - 1
+                current_prefix = "└── " if is_last else "├── "
+                sep = "\n" if i else ""
+                # Symlinked dirs are not expanded, matching the catalog walk;
+                # this also keeps is_dir() on the cached d_type (no stat).
+                if item.is_dir(follow_symlinks=False):
+                    # Subtree goes on its own line (left blank when depth runs out or it is empty)
+                    pending.append(f"{sep}{prefix}{current_prefix}{item.name}/\n")
+                    next_prefix = prefix + ("    " if is_last else "│   ")
+                    pending.append((item.path, next_prefix, depth + 1))
+                else:
+                    pending.append(f"{sep}{prefix}{current_prefix}{item.name}")
+            stack.extend(reversed(pending))
+    
+    def _write_component_catalog(self, out: IO[str]) -> None:
+        """Write component catalog organized by module."""
+        def line(text: str) -> None:
+            out.write("\n")
+            out.write(text)
+        
+        out.write("## Component Catalog\n")
+        line("Components organized by module/feature area.\n")
+        
+        # Analyze screens
+        screens = self._analyze_directory(self.src_path / "screens", "Screen")
+        if screens:
+            line("### Screens (`app/src/screens/`)\n")
+            line("Main UI pages that users navigate to.\n")
+            for screen in screens:
+                line(f"- **{screen['name']}**")
+                line(f"  - Path: `{screen['path']}`")
+                if screen.get('exports'):
+                    line(f"  - Exports: {', '.join(screen['exports'])}")
+                line("")
+        
+        # Analyze components by subdirectory
+        components_path = self.src_path / "components"
+        if components_path.exists():
+            line("### Components (`app/src/components/`)\n")
+            
+            # Group by subdirectory
+            component_groups = defaultdict(list)
+            for comp in self._analyze_directory(components_path, "Component"):
+                component_groups[comp['_group']].append(comp)
+            
+            for group, comps in sorted(component_groups.items()):
+                if group != "root":
+                    line(f"#### {group.title()} Components\n")
+                for comp in comps:
+                    line(f"- **{comp['name']}**")
+                    line(f"  - Path: `{comp['path']}`")
+                    if comp.get('exports'):
+                        line(f"  - Exports: {', '.join(comp['exports'])}")
+                    line("")
+        
+        # Analyze lib modules
+        lib_path = self.src_path / "lib"
+        if lib_path.exists():
+            line("### Library Modules (`app/src/lib/`)\n")
+            line("Core business logic organized by domain.\n")
+            
+            # Group by subdirectory
+            lib_groups = defaultdict(list)
+            for module in self._analyze_directory(lib_path, "Module"):
+                lib_groups[module['_group']].append(module)
+            
+            for group, modules in sorted(lib_groups.items()):
+                line(f"#### {group.title()} Module\n")
+                for module in modules:
+                    line(f"- **{module['name']}**")
+                    line(f"  - Path: `{module['path']}`")
+                    if module.get('exports'):
+                        line(f"  - Exports: {', '.join(module['exports'][:5])}")  # Limit to first 5
+                        if len(module['exports']) > 5:
+                            line(f"  - ... and {len(module['exports']) - 5} more")
+                    if module.get('key_functions'):
+                        line(f"  - Key Functions: {', '.join(module['key_functions'][:3])}")
+                    line("")
+    
+    def _analyze_directory(self, path: Path, file_type: str) -> List[Dict[str, Any]]:
+        """Analyze a directory and extract component/module information."""
+        if not path.exists():
+            return []
+        
+        repo_path_str = str(self.repo_path)
+        index = self._load_cache_index()
+        results: List[Optional[Dict[str, Any]]] = []
+        # Catalog group per slot: first subdirectory under `path`, or "root"
+        groups: List[str] = []
+        dir_prefix = os.path.join(str(path), "")
+        # (result slot, rel path, file path, stat) for files whose stat changed
+        to_read: List[Tuple[int, str, str, os.stat_result]] = []
+        
+        # .ts files are only included for lib modules
+        for file_path in _iter_source_files(path, include_ts="lib" in str(path)):
+            file_str = str(file_path)
+            rel = _strip_repo_root(file_str, repo_path_str) or os.path.relpath(file_str, repo_path_str)
+            self._cache_seen.add(rel)
+            try:
+                st = file_path.stat()
+            except OSError:
+                continue
+            sub_parts = file_str[len(dir_prefix):].split(os.sep, 1)
+            groups.append(sub_parts[0] if len(sub_parts) > 1 else "root")
+            if st.st_size > _MAX_ANALYZE_BYTES or any(m in file_path.name for m in _GENERATED_MARKERS):
+                # Bundled/minified/oversized sources: list them, but don't scan them.
+                results.append({'name': file_path.stem, 'path': rel, 'exports': [], 'key_functions': []})
+                continue
+            entry = index.get(rel)
+            # Unchanged stat: trust the cached analysis without reading the file.
+            if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+                results.append(entry["analysis"])
+                continue
+            to_read.append((len(results), rel, file_str, st))
+            results.append(None)
+        
+        # Overlap disk latency: fetch contents on I/O threads (reads release the GIL).
+        read_paths = [r[2] for r in to_read]
+        if len(read_paths) > 1:
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                contents = list(pool.map(_read_source, read_paths))
+        else:
+            contents = [_read_source(p) for p in read_paths]
+        
+        pending: List[Tuple[int, str, str, Dict[str, Any], bytes]] = []
+        for (slot, rel, file_str, st), data in zip(to_read, contents):
+            if data is None:
+                continue
+            digest = hashlib.sha256(data).hexdigest()
+            meta = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": digest}
+            entry = index.get(rel)
+            if entry and entry["sha256"] == digest:
+                # Touched but identical content.
+                index[rel] = {**meta, "analysis": entry["analysis"]}
+                results[slot] = entry["analysis"]
+                continue
+            pending.append((slot, rel, file_str, meta, data))
+        
+        paths = [p[2] for p in pending]
+        datas = [p[4] for p in pending]
+        analyzed = None
+        if len(paths) >= _PARALLEL_MIN_FILES:
+            # Files are independent and regex-bound, so spread them over processes.
+            try:
+                with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+                    analyzed = list(executor.map(
+                        _analyze_bytes, paths, datas, repeat(repo_path_str), repeat(file_type), chunksize=32
+                    ))
+            except (OSError, RuntimeError):
+                # No usable process pool here (e.g. restricted sandbox); do it inline.
+                analyzed = None
+        if analyzed is None:
+            analyzed = [_analyze_bytes(p, d, repo_path_str, file_type) for p, d in zip(paths, datas)]
+        
+        for (slot, rel, _, meta, _), item in zip(pending, analyzed):
+            results[slot] = item
+            if item:
+                index[rel] = {**meta, "analysis": item}
+        
+        items = []
+        for item, group in zip(results, groups):
+            if item:
+                item['_group'] = group
+                items.append(item)
+        return items
     
     def _generate_semantic_analysis(self) -> Optional[str]:
         """Generate semantic analysis of key modules using LLM (gpt-4o-mini)."""
@@ -573,8 +774,14 @@ app/
         semantic_parts = ["## Semantic Analysis (LLM-Generated Understanding)\n"]
         semantic_parts.append("This section provides semantic understanding of key modules, generated using LLM analysis (gpt-4o-mini).\n")
         
-        for module in key_modules:
-            analysis = self._analyze_module_semantically(module)
+        # Each module is an independent, seconds-long LLM round-trip; issue them
+        # concurrently (capped for rate limits) and keep the original order.
+        # The session is opened up front so worker threads share one pool.
+        self._http_session()
+        with ThreadPoolExecutor(max_workers=_LLM_MAX_CONCURRENCY) as pool:
+            analyses = list(pool.map(self._analyze_module_semantically, key_modules))
+        
+        for analysis in analyses:
             if analysis:
                 semantic_parts.append(analysis)
                 semantic_parts.append("")  # Blank line between modules
@@ -592,14 +799,15 @@ app/
                     try:
                         content = file_path.read_text(encoding="utf-8")
                         # Limit file size to avoid token bloat (first 3000 lines or 100k chars)
-                        lines = content.split("\n")
-                        if len(lines) > 3000:
-                            content = "\n".join(lines[:3000]) + "\n... [truncated for analysis]"
+                        # Count newlines in C rather than materializing every line
+                        if content.count("\n") >= 3000:
+                            head = content.split("\n", 3000)[:3000]
+                            content = "\n".join(head) + "\n... [truncated for analysis]"
                         elif len(content) > 100000:
                             content = content[:100000] + "\n... [truncated for analysis]"
                         file_contents.append(f"### {file_path_str}\n```typescript\n{content}\n```")
                     except Exception as e:
-                        if self._debug_enabled():
+                        if self._debug:
                             print(f"[KB] Failed to read {file_path_str}: {e}")
             
             if not file_contents:
@@ -631,7 +839,7 @@ Format as clear, structured markdown. Be specific and reference actual function
                 return f"### {module['name']}\n\n{response}"
             
         except Exception as e:
-            if self._debug_enabled():
+            if self._debug:
                 print(f"[KB] Semantic analysis failed for {module['name']}: {e}")
         
         return None
@@ -642,13 +850,7 @@ Format as clear, structured markdown. Be specific and reference actual function
             return None
         
         try:
-            import requests
-            
             url = "https://api.openai.com/v1/chat/completions"
-            headers = {
-                "Authorization": f"Bearer {self.openai_api_key}",
-                "Content-Type": "application/json",
-            }
             
             data = {
                 "model": "gpt-4o-mini",  # Cheap model for analysis
@@ -666,33 +868,30 @@ Format as clear, structured markdown. Be specific and reference actual function
                 "max_tokens": 2000,  # Limit output to control costs
             }
             
-            response = requests.post(url, json=data, headers=headers, timeout=60)
+            # Reuses keep-alive connections, so only the first call pays for TLS
+            response = self._http_session().post(url, json=data, timeout=60)
             response.raise_for_status()
             
             result = response.json()
             content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
             
-            if self._debug_enabled():
+            if self._debug:
                 usage = result.get("usage", {})
                 print(f"[KB] LLM analysis: {usage.get('prompt_tokens', 0)} input, {usage.get('completion_tokens', 0)} output tokens")
             
             return content.strip() if content else None
             
         except Exception as e:
-            if self._debug_enabled():
+            if self._debug:
                 print(f"[KB] LLM call failed: {e}")
             return None
     
-    def _debug_enabled(self) -> bool:
-        """Check if debug mode is enabled."""
-        return os.getenv("AGENT_DEBUG", "").strip().lower() in ("1", "true", "yes")
-    
     def save(self, output_path: Optional[Path] = None) -> Path:
         """Generate and save knowledge base to file."""
         if output_path is None:
             output_path = self.repo_path / "KNOWLEDGE_BASE.md"
         
-        kb_content = self.generate()
-        output_path.write_text(kb_content, encoding="utf-8")
+        with output_path.open("w", encoding="utf-8") as f:
+            self.write(f)
         
         return output_path
@@ -1,11 +1,74 @@
 """Milestone management utilities."""
 
-from typing import Dict, Any, List, Optional
+from bisect import bisect_left, insort
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
 from datetime import datetime
 
 
-def get_next_todo_milestone(milestones: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+class MilestoneIndex:
+    """
+    id and status lookups over a milestone list, built once.
+
+    The list and its milestone dicts are shared, not copied. Status changes
+    must go through `set_status` (or `update_milestone_status` with this
+    index) to keep the status buckets current.
+    """
+
+    def __init__(self, milestones: List[Dict[str, Any]]):
+        self.milestones = milestones
+        self.by_id: Dict[Any, Dict[str, Any]] = {}
+        # Buckets keep the milestones in list order.
+        self.by_status: Dict[Any, List[Dict[str, Any]]] = {}
+        self._pos: Dict[int, int] = {}
+        # No 'todo' milestone sits before this list position.
+        self._todo_cursor = 0
+        for i, milestone in enumerate(milestones):
+            self._pos[id(milestone)] = i
+            self.by_id.setdefault(milestone.get("id"), milestone)
+            self.by_status.setdefault(milestone.get("status"), []).append(milestone)
+
+    def _position(self, milestone: Dict[str, Any]) -> int:
+        return self._pos[id(milestone)]
+
+    def set_status(self, milestone: Dict[str, Any], status: str) -> None:
+        """Set a milestone's status and move it to the matching bucket."""
+        previous = milestone.get("status")
+        milestone["status"] = status
+        if previous == status:
+            return
+        bucket = self.by_status.get(previous)
+        if bucket:
+            i = bisect_left(bucket, self._position(milestone), key=self._position)
+            if i < len(bucket) and bucket[i] is milestone:
+                del bucket[i]
+        insort(self.by_status.setdefault(status, []), milestone, key=self._position)
+        if status == "todo":
+            self._todo_cursor = min(self._todo_cursor, self._position(milestone))
+
+    def next_todo(self) -> Optional[Dict[str, Any]]:
+        """First 'todo' milestone, resuming the scan where the last call stopped."""
+        milestones = self.milestones
+        cursor = self._todo_cursor
+        while cursor < len(milestones) and milestones[cursor].get("status") != "todo":
+            cursor += 1
+        self._todo_cursor = cursor
+        return milestones[cursor] if cursor < len(milestones) else None
+
+
+Milestones = Union[List[Dict[str, Any]], MilestoneIndex]
+
+
+def _as_index(milestones: Milestones) -> MilestoneIndex:
+    """Use a prebuilt index as-is, or index a plain list on the fly."""
+    if isinstance(milestones, MilestoneIndex):
+        return milestones
+    return MilestoneIndex(milestones)
+
+
+def get_next_todo_milestone(milestones: Milestones) -> Optional[Dict[str, Any]]:
     """Get the first milestone with status 'todo'."""
+    if isinstance(milestones, MilestoneIndex):
+        return milestones.next_todo()
     for milestone in milestones:
         if milestone.get("status") == "todo":
             return milestone
@@ -13,33 +76,42 @@ def get_next_todo_milestone(milestones: List[Dict[str, Any]]) -> Optional[Dict[s
 
 
 def update_milestone_status(
-    milestones: List[Dict[str, Any]],
+    milestones: Milestones,
     milestone_id: str,
     status: str,
-    reason: Optional[str] = None
+    reason: Optional[str] = None,
+    now_iso: Optional[str] = None
 ) -> bool:
-    """Update milestone status in list."""
-    for milestone in milestones:
-        if milestone.get("id") == milestone_id:
-            milestone["status"] = status
-            if reason:
-                milestone["reason"] = reason
-            if status == "in_progress":
-                milestone["started_at"] = datetime.now().isoformat()
-            elif status in ["done", "blocked"]:
-                milestone["completed_at"] = datetime.now().isoformat()
-            return True
-    return False
-
-
-def get_milestone_by_id(milestones: List[Dict[str, Any]], milestone_id: str) -> Optional[Dict[str, Any]]:
+    """Update milestone status in list (timestamps use `now_iso` when given)."""
+    index = _as_index(milestones)
+    milestone = index.by_id.get(milestone_id)
+    if milestone is None:
+        return False
+    index.set_status(milestone, status)
+    if reason:
+        milestone["reason"] = reason
+    if status == "in_progress":
+        milestone["started_at"] = now_iso or datetime.now().isoformat()
+    elif status in ["done", "blocked"]:
+        milestone["completed_at"] = now_iso or datetime.now().isoformat()
+    return True
+
+
+def update_milestones_status(items: Iterable[Tuple[str, str]], milestones: Milestones) -> int:
+    """Apply (milestone_id, status) updates with one shared timestamp; returns how many matched."""
+    index = _as_index(milestones)
+    now_iso = datetime.now().isoformat()
+    return sum(
+        update_milestone_status(index, milestone_id, status, now_iso=now_iso)
+        for milestone_id, status in items
+    )
+
+
+def get_milestone_by_id(milestones: Milestones, milestone_id: str) -> Optional[Dict[str, Any]]:
     """Get milestone by ID."""
-    for milestone in milestones:
-        if milestone.get("id") == milestone_id:
-            return milestone
-    return None
+    return _as_index(milestones).by_id.get(milestone_id)
 
 
-def get_milestones_by_status(milestones: List[Dict[str, Any]], status: str) -> List[Dict[str, Any]]:
+def get_milestones_by_status(milestones: Milestones, status: str) -> List[Dict[str, Any]]:
     """Get all milestones with given status."""
-    return [m for m in milestones if m.get("status") == status]
+    return list(_as_index(milestones).by_status.get(status, []))
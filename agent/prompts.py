@@ -9,40 +9,34 @@ Robust for GitHub Actions usage:
 
 from __future__ import annotations
 
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Callable, List, Dict, Any, Optional, Tuple, Union
+import asyncio
+import atexit
+import hashlib
 import os
+import random
+import re
+import threading
 import time
 import json
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
 
 
 # ---------------------------
-# Prompt builders
+# Prompt templates
 # ---------------------------
+# Static prompt text is built once at import; builders only fill the slots
+# with str.format_map ("{{" / "}}" are literal braces).
 
-def build_fix_prompt(
-    failing_checks: List[Dict[str, Any]],
-    repo_rules: List[str],
-    max_files: int,
-    max_lines: int
-) -> str:
-    check_details = "\n".join([
-        f"- {check['name']}: {check.get('error', 'Failed')}"
-        for check in failing_checks
-    ])
-
-    rules_text = "\n".join([f"- {rule}" for rule in repo_rules])
-
-    return f"""You are a code fixing agent for the Reclaim repository. Fix the failing truth checks below.
-
-REPO RULES (CRITICAL - MUST FOLLOW):
-{rules_text}
-
-FAILING CHECKS:
-{check_details}
-
-CONSTRAINTS:
-- Maximum {max_files} files changed
-- Maximum {max_lines} lines net change (additions - deletions)
+# Static fix instructions, sent as their own system message ahead of the
+# run-specific checks (see _MILESTONE_SYSTEM_PROMPT). Braces are literal.
+_FIX_SYSTEM_PROMPT = """You are a code fixing agent for the Reclaim repository. Fix the failing truth checks below.
 
 OUTPUT FORMAT (STRICT):
 - Output ONLY a valid unified diff patch that `git apply` can parse.
@@ -66,60 +60,31 @@ WHEN TO USE NO_PATCH (ONLY AS LAST RESORT):
 EXAMPLE of correct format:
 --- a/app/src/example.ts
 +++ b/app/src/example.ts
-@@ -15,7 +15,9 @@ export function example() {{
+@@ -15,7 +15,9 @@ export function example() {
   const x = 1;
   const y = 2;
 +  const z = 3;
   return x + y;
- }}
-
-Begin now:
+ }
 """
 
+_FIX_PROMPT_TEMPLATE = """REPO RULES (CRITICAL - MUST FOLLOW):
+{rules_text}
 
-def build_milestone_prompt(
-    milestone: Dict[str, Any],
-    repo_rules: List[str],
-    max_files: int,
-    max_lines: int,
-    current_files: Optional[str] = None
-) -> str:
-    acceptance = "\n".join([f"- {cmd}" for cmd in milestone.get("acceptance", [])])
-
-    # Optional rich spec block if present in milestone config
-    spec_block = ""
-    spec = milestone.get("spec")
-    if spec:
-        try:
-            spec_text = json.dumps(spec, indent=2, ensure_ascii=False)
-        except Exception:
-            spec_text = str(spec)
-        spec_block = f"\n\nDETAILED SPEC (authoritative for behavior, UX, and constraints):\n{spec_text}\n"
-
-    target_files = milestone.get("target_files", [])
-    files_context = ""
-    if target_files:
-        files_context = (
-            "\nTARGET FILES (focus on these patterns):\n"
-            + "\n".join([f"- {pattern}" for pattern in target_files])
-        )
+FAILING CHECKS:
+{check_details}
 
-    if current_files:
-        files_context += f"\n\nREPOSITORY CONTEXT (comprehensive information about the codebase):\n{current_files}\n\n"
-        files_context += "CRITICAL INSTRUCTIONS FOR PATCH GENERATION:\n"
-        files_context += "- Files marked 'FULL CONTENT' contain the COMPLETE file - use the EXACT line numbers from these files.\n"
-        files_context += "- Files marked 'PARTIAL' are truncated - be cautious with line numbers in these files.\n"
-        files_context += "- When generating hunks (e.g., @@ -441,6 +491,22 @@), the line numbers MUST match the actual file content.\n"
-        files_context += "- For files with FULL CONTENT, you can see the exact line numbers - use them precisely.\n"
-        files_context += "- Include sufficient context lines (at least 3-5 before and after changes) to help git apply match correctly.\n"
-        files_context += "\nUse the REPOSITORY STRUCTURE to understand file paths. "
-        files_context += "Use ALL FILES MATCHING TARGET PATTERNS to see what files exist. "
-        files_context += "Use FILE CONTENTS to understand code patterns. "
-        files_context += "Use KEY CONFIGURATION FILES to understand project settings."
+CONSTRAINTS:
+- Maximum {max_files} files changed
+- Maximum {max_lines} lines net change (additions - deletions)
 
-    rules_text = "\n".join([f"- {rule}" for rule in repo_rules])
+Begin now:
+"""
 
-    return f"""You are a code modification agent for the Reclaim repository. Complete the milestone below.
+# Static milestone instructions, sent as their own system message so every
+# milestone call in a run shares the same prompt prefix (and hits the
+# Responses API prompt cache). Not a template - braces are literal.
+_MILESTONE_SYSTEM_PROMPT = """You are a code modification agent for the Reclaim repository. Complete the milestone below.
 
 🚨 CRITICAL: YOU MUST IMPLEMENT THE FEATURE DESCRIBED IN THE MILESTONE 🚨
 - The milestone spec describes WHAT TO BUILD - you must ADD new functionality
@@ -196,12 +161,12 @@ RULES:
 EXAMPLE (this is the ONLY format you should use):
 ===FILE_START: app/src/example.ts===
 // Example file
-export function example() {{
+export function example() {
   const x = 1;
   const y = 2;
   const z = 3;
   return x + y + z;
-}}
+}
 ===FILE_END: app/src/example.ts===
 
 DO NOT output unified diff format like:
@@ -216,13 +181,14 @@ DO NOT output unified diff format like:
 - If scope_out says "No DB schema/migrations", do NOT modify database files
 - If scope_out says "No auth changes", do NOT modify authentication code
 - Always check scope_out before modifying any file - it's a hard constraint
+"""
 
-REPO RULES (CRITICAL - MUST FOLLOW):
+_MILESTONE_PROMPT_TEMPLATE = """REPO RULES (CRITICAL - MUST FOLLOW):
 {rules_text}
 
-MILESTONE:
-Title: {milestone['title']}
-Type: {milestone.get('type', 'feat')}
+{knowledge_block}MILESTONE:
+Title: {title}
+Type: {milestone_type}
 Acceptance commands (all must pass):
 {acceptance}
 {spec_block}{files_context}
@@ -248,17 +214,164 @@ REMEMBER: Output complete file content using ===FILE_START: path=== ... ===FILE_
 DO NOT output unified diff format. Start now:
 """
 
+# Delimit the knowledge base in milestone prompts (and let call_openai find it).
+_KB_START = "=== KNOWLEDGE BASE (Complete Codebase Understanding) ==="
+_KB_END = "=== END KNOWLEDGE BASE ==="
+
+_REPOSITORY_CONTEXT_INSTRUCTIONS = (
+    "CRITICAL INSTRUCTIONS FOR PATCH GENERATION:\n"
+    "- Files marked 'FULL CONTENT' contain the COMPLETE file - use the EXACT line numbers from these files.\n"
+    "- Files marked 'PARTIAL' are truncated - be cautious with line numbers in these files.\n"
+    "- When generating hunks (e.g., @@ -441,6 +491,22 @@), the line numbers MUST match the actual file content.\n"
+    "- For files with FULL CONTENT, you can see the exact line numbers - use them precisely.\n"
+    "- Include sufficient context lines (at least 3-5 before and after changes) to help git apply match correctly.\n"
+    "\nUse the REPOSITORY STRUCTURE to understand file paths. "
+    "Use ALL FILES MATCHING TARGET PATTERNS to see what files exist. "
+    "Use FILE CONTENTS to understand code patterns. "
+    "Use KEY CONFIGURATION FILES to understand project settings."
+)
+
+
+# ---------------------------
+# Prompt builders
+# ---------------------------
+
+def _canonical_text(text: Any) -> str:
+    """Text with \n line endings, no trailing whitespace per line, and no outer blank lines."""
+    return "\n".join(line.rstrip() for line in str(text).splitlines()).strip()
+
+
+def _rules_text(repo_rules: List[str]) -> str:
+    """Repo rules as sorted bullets, so config reordering doesn't change the prompt bytes."""
+    # Rules are text by the time they are keyed: YAML turns a rule such as
+    # "For UUID PK tables: omit id ..." into a (unhashable) dict.
+    return _rules_text_for(tuple(_canonical_text(rule) for rule in repo_rules))
+
+
+@lru_cache(maxsize=8)
+def _rules_text_for(repo_rules: Tuple[str, ...]) -> str:
+    # The same rules are formatted for every prompt (and retry) in a run.
+    return "\n".join(f"- {rule}" for rule in sorted(repo_rules))
+
+
+def build_fix_prompt(
+    failing_checks: List[Dict[str, Any]],
+    repo_rules: List[str],
+    max_files: int,
+    max_lines: int
+) -> Tuple[str, str]:
+    """
+    Build the fix prompt as a (system, user) pair for call_openai.
+
+    Checks are listed by name, so the prompt bytes don't depend on the order
+    the checks happened to run or fail in.
+    """
+    check_details = "\n".join(
+        f"- {check['name']}: {_canonical_text(check.get('error', 'Failed'))}"
+        for check in sorted(failing_checks, key=lambda c: c["name"])
+    )
+
+    rules_text = _rules_text(repo_rules)
+
+    return _FIX_SYSTEM_PROMPT, _FIX_PROMPT_TEMPLATE.format_map({
+        "rules_text": rules_text,
+        "check_details": check_details,
+        "max_files": max_files,
+        "max_lines": max_lines,
+    })
+
+
+def build_milestone_prompt(
+    milestone: Dict[str, Any],
+    repo_rules: List[str],
+    max_files: int,
+    max_lines: int,
+    current_files: Optional[str] = None,
+    knowledge_base: Optional[str] = None
+) -> Tuple[str, str]:
+    """
+    Build the milestone prompt as a (system, user) pair for call_openai.
+
+    The system part is the same for every milestone; only the user part varies.
+    The user part is ordered most-stable first: repo rules, then the knowledge
+    base (unchanged across the milestones of a run), then the milestone itself
+    and the target file contents. That order is what lets the prompt cache
+    cover the knowledge base, so keep milestone-specific text after it.
+    Rules, target patterns and spec keys are sorted so reruns produce the same
+    bytes; keep milestone titles stable across reruns for the same reason.
+    Acceptance commands keep their configured order (e.g. install before test).
+    """
+    acceptance = "\n".join(f"- {cmd}" for cmd in milestone.get("acceptance", []))
+
+    # Optional rich spec block if present in milestone config
+    spec_block = ""
+    spec = milestone.get("spec")
+    if spec:
+        try:
+            # Compact and key-sorted: indentation would only add billed input tokens.
+            spec_text = _dumps(spec, sort_keys=True)
+        except Exception:
+            spec_text = str(spec)
+        spec_block = f"\n\nDETAILED SPEC (authoritative for behavior, UX, and constraints):\n{spec_text}\n"
+
+    target_files = milestone.get("target_files", [])
+    target_block = ""
+    if target_files:
+        bullets = "\n".join(f"- {pattern}" for pattern in sorted(target_files))
+        target_block = f"\nTARGET FILES (focus on these patterns):\n{bullets}"
+
+    # Assemble the whole block in one formatting step; the instructions are a constant.
+    files_context = (
+        f"{target_block}\n\nREPOSITORY CONTEXT (comprehensive information about the codebase):\n"
+        f"{current_files}\n\n{_REPOSITORY_CONTEXT_INSTRUCTIONS}"
+        if current_files
+        else target_block
+    )
+
+    rules_text = _rules_text(repo_rules)
+    knowledge_block = (
+        f"{_KB_START}\n{knowledge_base}\n{_KB_END}\n\n"
+        if knowledge_base
+        else ""
+    )
+
+    return _MILESTONE_SYSTEM_PROMPT, _MILESTONE_PROMPT_TEMPLATE.format_map({
+        "rules_text": rules_text,
+        "knowledge_block": knowledge_block,
+        "title": milestone['title'],
+        "milestone_type": milestone.get('type', 'feat'),
+        "acceptance": acceptance,
+        "spec_block": spec_block,
+        "files_context": files_context,
+        "max_files": max_files,
+        "max_lines": max_lines,
+    })
+
 
 # ---------------------------
 # Helpers / env
 # ---------------------------
 
-def _env_flag(name: str) -> bool:
-    return os.getenv(name, "").strip().lower() in ("1", "true", "yes", "y", "on")
+# Environment variables don't change during a run, so each lookup and parse is
+# memoized per process (first read happens at call time, after .env loading).
+# Call reload_env() after changing os.environ.
+
+@lru_cache(maxsize=None)
+def _env_str(name: str) -> str:
+    return os.getenv(name, "").strip()
 
 
+@lru_cache(maxsize=None)
+def _env_flag(name: str, default: bool = False) -> bool:
+    raw = _env_str(name)
+    if not raw:
+        return default
+    return raw.lower() in ("1", "true", "yes", "y", "on")
+
+
+@lru_cache(maxsize=None)
 def _env_int(name: str, default: int) -> int:
-    raw = os.getenv(name, "").strip()
+    raw = _env_str(name)
     if not raw:
         return default
     try:
@@ -267,8 +380,9 @@ def _env_int(name: str, default: int) -> int:
         return default
 
 
+@lru_cache(maxsize=None)
 def _env_float(name: str) -> Optional[float]:
-    raw = os.getenv(name, "").strip()
+    raw = _env_str(name)
     if not raw:
         return None
     try:
@@ -277,15 +391,104 @@ def _env_float(name: str) -> Optional[float]:
         return None
 
 
+def reload_env() -> None:
+    """Forget memoized env lookups so the next read sees the current os.environ (e.g. in tests)."""
+    for helper in (_env_str, _env_flag, _env_int, _env_float):
+        helper.cache_clear()
+
+
 def _clamp(n: int, lo: int, hi: int) -> int:
     return max(lo, min(hi, n))
 
 
+def _dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> str:
+    """Serialize to JSON text (non-ASCII kept as-is), using orjson when installed."""
+    if orjson is not None:
+        option = (
+            orjson.OPT_NON_STR_KEYS
+            | (orjson.OPT_INDENT_2 if indent else 0)
+            | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        )
+        return orjson.dumps(obj, option=option).decode("utf-8")
+    return json.dumps(
+        obj,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+        sort_keys=sort_keys,
+        ensure_ascii=False,
+    )
+
+
+def _json_body(obj: Any) -> bytes:
+    """Compact UTF-8 JSON request body, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json_response(resp: Any) -> Any:
+    """Parse a JSON response body, using orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(resp.content)
+    return resp.json()
+
+
+class _PreviewFull(Exception):
+    """Raised by _PreviewSink once it holds `limit` characters."""
+
+
+class _PreviewSink:
+    """Write target for json.dump that stops the encoder after `limit` characters."""
+
+    def __init__(self, limit: int):
+        self.parts: List[str] = []
+        self.size = 0
+        self.limit = limit
+
+    def write(self, chunk: str) -> None:
+        self.parts.append(chunk)
+        self.size += len(chunk)
+        if self.size >= self.limit:
+            raise _PreviewFull
+
+
 def _safe_json_preview(obj: Any, limit: int = 2000) -> str:
+    """First `limit` characters of `obj` as JSON, without encoding the rest."""
+    sink = _PreviewSink(limit)
     try:
-        return json.dumps(obj, ensure_ascii=False)[:limit]
+        json.dump(obj, sink, ensure_ascii=False)
+    except _PreviewFull:
+        pass
     except Exception:
         return str(obj)[:limit]
+    return "".join(sink.parts)[:limit]
+
+
+# OpenAI error JSON is tiny; anything past this is a proxy/HTML error page.
+_ERROR_BODY_MAX = 64 * 1024
+
+
+def _read_error_body(resp: Any, streamed: bool) -> bytes:
+    """Error response body, reading at most _ERROR_BODY_MAX bytes off the wire."""
+    length = resp.headers.get("Content-Length")
+    if length is not None and length.isdigit() and int(length) <= _ERROR_BODY_MAX:
+        # Small body: read it normally so the connection goes back to the pool.
+        return resp.content
+    if not streamed:
+        # Not streamed: already downloaded, just don't decode all of it.
+        return resp.content[:_ERROR_BODY_MAX]
+    with resp:
+        return resp.raw.read(_ERROR_BODY_MAX, decode_content=True) or b""
+
+
+def _cached_tokens(payload: Dict[str, Any]) -> int:
+    """Input tokens served from OpenAI's prompt cache, per the response usage."""
+    usage = payload.get("usage") or {}
+    details = usage.get("input_tokens_details") or usage.get("prompt_tokens_details") or {}
+    return details.get("cached_tokens") or 0
+
+
+_TEXT_TYPES = frozenset(("output_text", "text"))
 
 
 def _extract_text_from_responses_api(payload: dict) -> str:
@@ -299,26 +502,44 @@ def _extract_text_from_responses_api(payload: dict) -> str:
         { "type": "reasoning", ... }
       ]
     """
-    if isinstance(payload.get("output_text"), str) and payload["output_text"].strip():
-        return payload["output_text"].strip()
+    text = payload.get("output_text")
+    if isinstance(text, str):
+        text = text.strip()
+        if text:
+            return text
 
     out = payload.get("output")
     if isinstance(out, list):
-        parts: List[str] = []
+        # Usually there is exactly one text fragment: return it without
+        # building a list to join.
+        first: Optional[str] = None
+        parts: Optional[List[str]] = None
         for item in out:
             content = item.get("content")
-            if isinstance(content, list):
-                for c in content:
-                    ctype = c.get("type")
-                    if ctype in ("output_text", "text") and isinstance(c.get("text"), str):
-                        parts.append(c["text"])
-        text = "\n".join(parts).strip()
-        if text:
-            return text
+            if not isinstance(content, list):
+                continue
+            for c in content:
+                if c.get("type") in _TEXT_TYPES:
+                    fragment = c.get("text")
+                    if not isinstance(fragment, str):
+                        continue
+                    if first is None:
+                        first = fragment
+                    elif parts is None:
+                        parts = [first, fragment]
+                    else:
+                        parts.append(fragment)
+        if first is not None:
+            text = (first if parts is None else "\n".join(parts)).strip()
+            if text:
+                return text
 
     return ""
 
 
+_DIFF_START_RE = re.compile(r"^--- [^\n]*\n\+\+\+ ", re.MULTILINE)
+
+
 def _sanitize_to_unified_diff(text: str) -> str:
     """
     Ensure we return only the unified diff part starting at the first '---' line.
@@ -328,6 +549,12 @@ def _sanitize_to_unified_diff(text: str) -> str:
     if not text:
         return ""
 
+    # Prefer a real file header (a '--- ' line followed by a '+++ ' line) so a
+    # stray '--- ' in leading prose doesn't become the start of the patch.
+    m = _DIFF_START_RE.search(text)
+    if m:
+        return text[m.start():].strip()
+
     # Look for unified diff start: --- a/... or --- /dev/null or just ---
     idx = text.find("--- ")
     if idx == -1:
@@ -352,31 +579,355 @@ def _is_incomplete_max_tokens(payload: dict) -> bool:
 # ---------------------------
 
 def _sanitize_output(text: str, response_format: str) -> str:
+    """Response text cleaned for `response_format`; always stripped ("" if nothing is left)."""
     if response_format == "diff":
         return _sanitize_to_unified_diff(text)
     return text.strip()
 
 
-def call_openai(prompt: str, api_key: str, response_format: str = "diff") -> Optional[str]:
+def _read_sse_response(resp: Any) -> Optional[dict]:
+    """
+    Collect a streamed (server-sent events) Responses API reply.
+
+    Returns the final response object from the terminal event, so callers see
+    the same payload shape as a non-streamed reply. Text deltas are kept as a
+    fallback in case the stream ends without one.
+    """
+    deltas: List[str] = []
+    final: Optional[dict] = None
+    for line in resp.iter_lines():
+        if not line.startswith(b"data:"):
+            continue
+        chunk = line[5:].strip()
+        if chunk == b"[DONE]":
+            break
+        try:
+            event = orjson.loads(chunk) if orjson is not None else json.loads(chunk)
+        except ValueError:
+            continue
+        if not isinstance(event, dict):
+            continue
+        etype = event.get("type")
+        if etype == "response.output_text.delta":
+            deltas.append(event.get("delta") or "")
+        elif etype in ("response.completed", "response.incomplete", "response.failed"):
+            final = event.get("response")
+            break
+        elif etype == "error":
+            return {"error": event.get("error", event)}
+
+    text = "".join(deltas)
+    if isinstance(final, dict):
+        if text and not _extract_text_from_responses_api(final):
+            final = {**final, "output_text": text}
+        return final
+    return {"output_text": text} if text else None
+
+
+# Shared keep-alive sessions (one per API key, with its auth headers preset) so
+# retries, continuations and back-to-back calls reuse the TLS connection to
+# api.openai.com. Created on first call; the lock covers concurrent first calls
+# from call_openai_async worker threads.
+_SESSIONS: Dict[str, Any] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def _session(api_key: str) -> Any:
+    session = _SESSIONS.get(api_key)
+    if session is not None:
+        return session
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(api_key)
+        if session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            session.headers.update({
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+            })
+            # Retries stay in call_openai's own loop (it adapts the request between attempts).
+            # Room for every call_openai_async request allowed in flight, so none
+            # of their connections are discarded instead of returned to the pool.
+            pool_maxsize = max(8, _env_int("OPENAI_CONCURRENCY", 4))
+            session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=0))
+            _SESSIONS[api_key] = session
+    return session
+
+
+# In-process circuit breaker (OPENAI_CIRCUIT_BREAKER=1): after this many
+# consecutive transient failures (429/5xx, timeouts, connection errors), calls
+# return None without touching the network until the cooldown has passed.
+_BREAKER_THRESHOLD = 5
+_BREAKER_COOLDOWN_S = 60.0
+_BREAKER: Dict[str, Any] = {"fails": 0, "open_until": 0.0}
+_BREAKER_LOCK = threading.Lock()
+
+
+def _breaker_open() -> bool:
+    return time.monotonic() < _BREAKER["open_until"]
+
+
+def _breaker_record(ok: bool) -> None:
+    with _BREAKER_LOCK:
+        if ok:
+            _BREAKER["fails"] = 0
+            return
+        _BREAKER["fails"] += 1
+        if _BREAKER["fails"] >= _BREAKER_THRESHOLD:
+            _BREAKER["fails"] = 0
+            _BREAKER["open_until"] = time.monotonic() + _BREAKER_COOLDOWN_S
+
+
+def _jittered(backoff_s: float) -> float:
+    """Full-jitter delay for a transient-failure retry, so parallel calls spread out."""
+    return random.uniform(0, backoff_s)
+
+
+class _BudgetExhausted(Exception):
+    """Raised when too little of OPENAI_TOTAL_BUDGET_S is left for another request."""
+
+
+# First input message of every request: fixed per response format, so it is
+# the start of the byte-identical prefix that OpenAI's prompt cache matches on.
+_DIFF_SYSTEM_MESSAGE = (
+    "You output a valid unified diff patch starting with '--- a/...'. "
+    "Preserve all existing functionality when modifying files."
+)
+_FILE_SYSTEM_MESSAGE = (
+    "You output complete file content using ===FILE_START: path=== ... ===FILE_END: path=== format. "
+    "Preserve all existing functionality when modifying files."
+)
+
+
+# A prompt is the user text alone, a (static system text, variable user text)
+# pair, or ready-made Responses API input messages.
+Prompt = Union[str, Tuple[str, str], List[Dict[str, Any]]]
+
+
+def _input_messages(prompt: Prompt, system_prompt: str) -> List[Dict[str, Any]]:
+    """Responses API input for `prompt`, static system text first (cacheable prefix)."""
+    if isinstance(prompt, str):
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt},
+        ]
+    if isinstance(prompt, tuple):
+        static, user = prompt
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": static},
+            {"role": "user", "content": user},
+        ]
+    return list(prompt)
+
+
+def _user_text(prompt: Prompt) -> str:
+    """The user-role text in `prompt`."""
+    if isinstance(prompt, str):
+        return prompt
+    if isinstance(prompt, tuple):
+        return prompt[1]
+    return "\n".join(m.get("content") or "" for m in prompt if m.get("role") == "user")
+
+
+def _output_source_chars(prompt: Prompt) -> int:
+    """
+    Length of the user text a file-mode response may re-emit.
+
+    That is the spec and target file contents; the knowledge base block is
+    reference material and can dwarf them, so it is left out.
+    """
+    text = _user_text(prompt)
+    start = text.find(_KB_START)
+    end = text.find(_KB_END, start) if start >= 0 else -1
+    if end < 0:
+        return len(text)
+    return len(text) - (end + len(_KB_END) - start)
+
+
+def _cache_key(model: str, prompt: Prompt, response_format: str) -> str:
+    """SHA-256 over a canonical dump of everything that shapes the response."""
+    request = {
+        "model": model,
+        "format": response_format,
+        "input": _input_messages(prompt, ""),
+        "max_output_tokens": _env_int("OPENAI_MAX_OUTPUT_TOKENS", 4000),
+        "max_output_tokens_cap": _env_int("OPENAI_MAX_OUTPUT_TOKENS_CAP", 20000),
+        "temperature": _env_float("OPENAI_TEMPERATURE") if _env_flag("OPENAI_ENABLE_TEMPERATURE") else None,
+        "verbosity": _env_str("OPENAI_TEXT_VERBOSITY") or None,
+    }
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _response_cache_dir() -> Path:
+    return Path(_env_str("OPENAI_CACHE_DIR") or ".reclaim-cache/openai")
+
+
+# In-process layer over the disk cache: key -> (stored-at epoch seconds, text).
+_RESPONSE_CACHE: Dict[str, Tuple[float, str]] = {}
+
+
+def _read_cached_response(path: Path) -> Optional[Tuple[float, str]]:
+    """(mtime, text) of a cached response, or None if missing or older than OPENAI_CACHE_TTL_S."""
+    try:
+        mtime = path.stat().st_mtime
+        if time.time() - mtime > _env_int("OPENAI_CACHE_TTL_S", 86400):
+            return None
+        return mtime, path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+def _write_cache_file(path: Path, text: str) -> None:
+    """Write a cache file atomically (best effort)."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Keep cached responses out of commits wherever the cache dir lives.
+        gitignore = path.parent / ".gitignore"
+        if not gitignore.exists():
+            gitignore.write_text("*\n", encoding="utf-8")
+        # Per process *and* thread: call_openai_async writes from worker threads.
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+# Observed output sizes per response format, {format: EMA of usage.output_tokens},
+# used to pick the first request's budget when OPENAI_MAX_OUTPUT_TOKENS is unset.
+# Opt-in with the response cache (OPENAI_CACHE_ENABLED); kept in memory and
+# flushed to token-stats.json in the cache dir at most every _TOKEN_STATS_FLUSH_S.
+_TOKEN_STATS_FILE = "token-stats.json"
+_TOKEN_STATS_ALPHA = 0.3
+# Headroom over the average so typical outputs fit the first attempt.
+_TOKEN_STATS_HEADROOM = 1.5
+_TOKEN_STATS_FLUSH_S = 60.0
+_TOKEN_STATS: Optional[Dict[str, float]] = None
+_TOKEN_STATS_FLUSHED = 0.0
+_TOKEN_STATS_LOCK = threading.Lock()
+
+
+def _token_stats_path() -> Path:
+    return _response_cache_dir() / _TOKEN_STATS_FILE
+
+
+def _token_stats() -> Dict[str, float]:
+    """The in-memory stats, loaded from disk on first use (hold _TOKEN_STATS_LOCK)."""
+    global _TOKEN_STATS
+    if _TOKEN_STATS is None:
+        try:
+            stats = json.loads(_token_stats_path().read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            stats = {}
+        _TOKEN_STATS = {
+            k: float(v) for k, v in stats.items() if isinstance(v, (int, float))
+        } if isinstance(stats, dict) else {}
+    return _TOKEN_STATS
+
+
+def _flush_token_stats() -> None:
+    """Write the in-memory stats to disk (best effort)."""
+    global _TOKEN_STATS_FLUSHED
+    with _TOKEN_STATS_LOCK:
+        if _TOKEN_STATS is None:
+            return
+        text = json.dumps(_TOKEN_STATS, sort_keys=True)
+        _TOKEN_STATS_FLUSHED = time.monotonic()
+    _write_cache_file(_token_stats_path(), text)
+
+
+def _initial_output_tokens(response_format: str, default: int) -> int:
+    """First-attempt budget: the learned size plus headroom, never above `default`."""
+    if not _env_flag("OPENAI_CACHE_ENABLED"):
+        return default
+    with _TOKEN_STATS_LOCK:
+        learned = _token_stats().get(response_format)
+    if learned is None:
+        return default
+    return min(default, int(learned * _TOKEN_STATS_HEADROOM))
+
+
+def _record_output_tokens(response_format: str, payload: Dict[str, Any]) -> None:
+    """Fold a successful response's output token count into the stats."""
+    if not _env_flag("OPENAI_CACHE_ENABLED"):
+        return
+    used = (payload.get("usage") or {}).get("output_tokens")
+    if not isinstance(used, int) or used <= 0:
+        return
+    with _TOKEN_STATS_LOCK:
+        stats = _token_stats()
+        previous = stats.get(response_format)
+        if previous is not None:
+            used = _TOKEN_STATS_ALPHA * used + (1 - _TOKEN_STATS_ALPHA) * previous
+        stats[response_format] = round(used, 1)
+        due = time.monotonic() - _TOKEN_STATS_FLUSHED >= _TOKEN_STATS_FLUSH_S
+    if due:
+        _flush_token_stats()
+
+
+# Keep the last updates of a run that ends between periodic flushes.
+atexit.register(_flush_token_stats)
+
+
+def call_openai(prompt: Prompt, api_key: str, response_format: str = "diff") -> Optional[str]:
     """
     Call OpenAI Responses API with prompt and return the response text.
+    prompt: user text, a (system, user) pair, or a list of input messages.
     response_format: "diff" for unified diff, "file" for ===FILE_START=== blocks.
     Returns None on failure.
+
+    With OPENAI_CACHE_ENABLED=1, successful responses are kept in memory and on
+    disk (OPENAI_CACHE_DIR), and identical requests within OPENAI_CACHE_TTL_S
+    are answered from there without calling the API. Sampled requests
+    (temperature > 0) are never cached. The same flag enables the learned
+    first-attempt output budget (token-stats.json in the cache dir).
     """
+    if not _env_flag("OPENAI_CACHE_ENABLED"):
+        return _call_openai_uncached(prompt, api_key, response_format)
+    if _env_flag("OPENAI_ENABLE_TEMPERATURE") and (_env_float("OPENAI_TEMPERATURE") or 0) > 0:
+        # A repeat of a sampled request is meant to produce a different answer.
+        return _call_openai_uncached(prompt, api_key, response_format)
+
+    model = _env_str("OPENAI_MODEL") or "gpt-4.1"
+    key = _cache_key(model, prompt, response_format)
+    hit = _RESPONSE_CACHE.get(key)
+    if hit is not None and time.time() - hit[0] <= _env_int("OPENAI_CACHE_TTL_S", 86400):
+        return hit[1]
+
+    path = _response_cache_dir() / f"{key}.txt"
+    cached = _read_cached_response(path)
+    if cached is not None:
+        if _env_flag("AGENT_DEBUG"):
+            print(f"[AGENT_DEBUG] OpenAI response served from cache: {path}")
+        # The stat taken before the read: the file may be evicted by now.
+        _RESPONSE_CACHE[key] = cached
+        return cached[1]
+
+    text = _call_openai_uncached(prompt, api_key, response_format)
+    if text:
+        _RESPONSE_CACHE[key] = (time.time(), text)
+        _write_cache_file(path, text)
+    return text
+
+
+def _call_openai_uncached(prompt: Prompt, api_key: str, response_format: str) -> Optional[str]:
+    """Request a response from the API (call_openai without the response cache)."""
     import requests
 
     debug = _env_flag("AGENT_DEBUG")
 
-    def _dbg(msg: str) -> None:
+    def _dbg(msg: Union[str, Callable[[], str]]) -> None:
+        # Pass a lambda for formatted messages so nothing is built when debug is off.
         if debug:
-            print(msg)
+            print(msg() if callable(msg) else msg)
 
-    model = os.getenv("OPENAI_MODEL", "").strip() or "gpt-4.1"
+    model = _env_str("OPENAI_MODEL") or "gpt-4.1"
     url = "https://api.openai.com/v1/responses"
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
+    session = _session(api_key)
 
     # Timeouts
     connect_timeout_s = _env_int("OPENAI_CONNECT_TIMEOUT_S", 15)
@@ -384,38 +935,50 @@ def call_openai(prompt: str, api_key: str, response_format: str = "diff") -> Opt
 
     # Token controls
     start_tokens = _env_int("OPENAI_MAX_OUTPUT_TOKENS", 4000)
+    if not _env_str("OPENAI_MAX_OUTPUT_TOKENS"):
+        # Size the first attempt from what this kind of response has needed
+        # before (capped at the default); incomplete attempts are bumped below.
+        start_tokens = _initial_output_tokens(response_format, start_tokens)
+        if response_format == "file":
+            # File mode re-emits whole files that are embedded in the prompt, so
+            # their size (~4 chars per token) bounds what the output needs.
+            start_tokens = max(start_tokens, _output_source_chars(prompt) // 4)
     cap_tokens = _env_int("OPENAI_MAX_OUTPUT_TOKENS_CAP", 20000)
     max_output_tokens = _clamp(start_tokens, 512, cap_tokens)
 
     # Retries
-    retries = _env_int("OPENAI_RETRIES", 3)
+    retries = _clamp(_env_int("OPENAI_RETRIES", 3), 1, 8)
     backoff_s = _env_int("OPENAI_BACKOFF_S", 2)
 
+    # Overall wall-clock budget for this call, covering attempts, continuation and
+    # backoff sleeps (0 disables it).
+    budget_s = _env_int("OPENAI_TOTAL_BUDGET_S", 300)
+    deadline = time.monotonic() + budget_s if budget_s > 0 else None
+    posted = False
+
+    def _backoff() -> None:
+        # Every retry path waits here: full jitter, doubling up to 30s, and never
+        # past the deadline (the next _post then gives up cleanly).
+        nonlocal backoff_s
+        seconds = _jittered(backoff_s)
+        if deadline is not None:
+            seconds = min(seconds, max(0.0, deadline - time.monotonic() - 1))
+        time.sleep(seconds)
+        backoff_s = min(backoff_s * 2, 30)
+
     # Optional temperature: OFF by default, only enabled if you explicitly set OPENAI_ENABLE_TEMPERATURE=1
     enable_temp = _env_flag("OPENAI_ENABLE_TEMPERATURE")
     temp = _env_float("OPENAI_TEMPERATURE") if enable_temp else None
 
     # Optional verbosity: default OFF (because your codex runs showed it rejects low and only supports medium).
     # If you set OPENAI_TEXT_VERBOSITY, we will try it, but auto-remove on model rejection.
-    verbosity = os.getenv("OPENAI_TEXT_VERBOSITY", "").strip() or None
+    verbosity = _env_str("OPENAI_TEXT_VERBOSITY") or None
 
     # Base request body (Responses API)
-    system_prompt = (
-        "You output a valid unified diff patch starting with '--- a/...'. "
-        "Preserve all existing functionality when modifying files."
-        if response_format == "diff"
-        else "You output complete file content using ===FILE_START: path=== ... ===FILE_END: path=== format. "
-        "Preserve all existing functionality when modifying files."
-    )
+    system_prompt = _DIFF_SYSTEM_MESSAGE if response_format == "diff" else _FILE_SYSTEM_MESSAGE
     data: Dict[str, Any] = {
         "model": model,
-        "input": [
-            {
-                "role": "system",
-                "content": system_prompt,
-            },
-            {"role": "user", "content": prompt},
-        ],
+        "input": _input_messages(prompt, system_prompt),
         "max_output_tokens": max_output_tokens,
         "text": {"format": {"type": "text"}},
     }
@@ -426,27 +989,53 @@ def call_openai(prompt: str, api_key: str, response_format: str = "diff") -> Opt
     if temp is not None:
         data["temperature"] = temp  # may be rejected; we handle it below
 
+    # Stream by default: tokens keep arriving during long generations, so the
+    # read timeout bounds gaps between chunks rather than the whole reply.
+    stream = _env_flag("OPENAI_STREAM", default=True)
+    if stream:
+        data["stream"] = True
+
     def _post(req_data: Dict[str, Any], timeout_pair: Tuple[int, int]) -> Tuple[int, Optional[dict], str]:
-        resp = requests.post(url, headers=headers, json=req_data, timeout=timeout_pair)
+        nonlocal posted
+        if deadline is not None and posted:
+            # Follow-up requests (retries, continuation) only run within the budget.
+            remaining = deadline - time.monotonic()
+            if remaining < timeout_pair[0] + 5:
+                raise _BudgetExhausted
+            timeout_pair = (timeout_pair[0], min(timeout_pair[1], max(5, int(remaining))))
+        posted = True
+        # Serialized here (compact, orjson when available); the session presets Content-Type.
+        resp = session.post(url, data=_json_body(req_data), timeout=timeout_pair, stream=stream)
         status = resp.status_code
+        # requests already advertises the encodings urllib3 can decode (gzip/deflate,
+        # plus br/zstd when those packages are installed) and decompresses transparently.
+        _dbg(lambda: f"[AGENT_DEBUG] OpenAI response content-encoding={resp.headers.get('Content-Encoding') or 'identity'}")
+        if status == 200 and resp.headers.get("Content-Type", "").startswith("text/event-stream"):
+            with resp:
+                return status, _read_sse_response(resp), ""
         if status == 200:
             try:
-                return status, resp.json(), ""
-            except Exception:
-                return status, None, resp.text
-        else:
-            try:
-                return status, resp.json(), ""
+                return status, _json_response(resp), ""
             except Exception:
-                return status, None, resp.text
+                # Only shown as a 2000-char debug preview; don't decode the whole body.
+                return status, None, resp.content[:2000].decode("utf-8", "replace")
+        body = _read_error_body(resp, stream)
+        try:
+            return status, (orjson.loads(body) if orjson is not None else json.loads(body)), ""
+        except Exception:
+            return status, None, body[:2000].decode("utf-8", "replace")
 
     last_err: Optional[dict] = None
     last_raw_text: str = ""
+    breaker = _env_flag("OPENAI_CIRCUIT_BREAKER")
 
     for attempt in range(1, retries + 1):
+        if breaker and _breaker_open():
+            print("OpenAI circuit breaker open after repeated failures; skipping request.")
+            return None
         try:
             _dbg(
-                f"[AGENT_DEBUG] OpenAI request: endpoint=v1/responses model={model} "
+                lambda: f"[AGENT_DEBUG] OpenAI request: endpoint=v1/responses model={model} "
                 f"attempt={attempt}/{retries} max_output_tokens={data.get('max_output_tokens')} "
                 f"timeout=({connect_timeout_s}, {read_timeout_s})"
             )
@@ -455,17 +1044,21 @@ def call_openai(prompt: str, api_key: str, response_format: str = "diff") -> Opt
             last_raw_text = raw_text
 
             if status == 200 and isinstance(payload, dict):
+                if breaker:
+                    _breaker_record(ok=True)
                 if debug:
                     print(f"[AGENT_DEBUG] OpenAI raw response (first 2000 chars): {_safe_json_preview(payload, 2000)}")
+                    print(f"[AGENT_DEBUG] OpenAI prompt cache: {_cached_tokens(payload)} cached input tokens")
 
                 content = _extract_text_from_responses_api(payload)
-                preview = (content[:400] if content else "").replace("\n", "\\n")
-                _dbg(f"[AGENT_DEBUG] OpenAI content preview (first 400 chars): {preview}")
+                _dbg(lambda: "[AGENT_DEBUG] OpenAI content preview (first 400 chars): "
+                     + (content[:400] if content else "").replace("\n", "\\n"))
 
                 # If we got something, sanitize to diff and return.
                 if content and content.strip():
-                    clean = _sanitize_output(content, response_format)
-                    return clean.strip() if clean and clean.strip() else None
+                    _record_output_tokens(response_format, payload)
+                    # Sanitized output is already stripped; "" means nothing usable.
+                    return _sanitize_output(content, response_format) or None
 
                 # If we got no text but the response is incomplete due to token cap,
                 # bump tokens and (optionally) do a continuation with previous_response_id.
@@ -473,7 +1066,7 @@ def call_openai(prompt: str, api_key: str, response_format: str = "diff") -> Opt
                     current = int(data.get("max_output_tokens") or max_output_tokens)
                     bumped = _clamp(max(current * 3, current + 2000), 512, cap_tokens)
                     if bumped > current:
-                        _dbg(f"[AGENT_DEBUG] Incomplete due to max_output_tokens. Bumping {current} -> {bumped} and retrying.")
+                        _dbg(lambda: f"[AGENT_DEBUG] Incomplete due to max_output_tokens. Bumping {current} -> {bumped} and retrying.")
                         data["max_output_tokens"] = bumped
                         # increase read timeout as well
                         read_timeout_s = max(read_timeout_s, _env_int("OPENAI_READ_TIMEOUT_S", 120))
@@ -484,43 +1077,51 @@ def call_openai(prompt: str, api_key: str, response_format: str = "diff") -> Opt
                     resp_id = payload.get("id")
                     if isinstance(resp_id, str) and resp_id:
                         _dbg("[AGENT_DEBUG] Still no text at token cap; attempting continuation via previous_response_id.")
-                        cont_data = dict(data)
-                        cont_data["previous_response_id"] = resp_id
                         continuation_instruction = (
                             "Continue. Output ONLY the unified diff patch starting with '--- a/...'."
                             if response_format == "diff"
                             else "Continue. Output ONLY complete file content using ===FILE_START: path=== ... ===FILE_END: path=== format."
                         )
-                        cont_data["input"] = [
-                            {
-                                "role": "user",
-                                "content": continuation_instruction,
-                            }
-                        ]
+                        # previous_response_id restores the earlier conversation server-side,
+                        # so only the new turn and generation settings are sent.
+                        cont_data: Dict[str, Any] = {
+                            "model": data["model"],
+                            "previous_response_id": resp_id,
+                            "input": [
+                                {
+                                    "role": "user",
+                                    "content": continuation_instruction,
+                                }
+                            ],
+                            "max_output_tokens": data["max_output_tokens"],
+                            "text": data["text"],
+                        }
+                        for key in ("temperature", "stream"):
+                            if key in data:
+                                cont_data[key] = data[key]
                         # more time for continuation
                         status2, payload2, raw2 = _post(cont_data, (connect_timeout_s, max(read_timeout_s, 300)))
                         if status2 == 200 and isinstance(payload2, dict):
                             if debug:
                                 print(f"[AGENT_DEBUG] OpenAI continuation raw (first 2000): {_safe_json_preview(payload2, 2000)}")
                             cont_text = _extract_text_from_responses_api(payload2)
-                            cont_preview = (cont_text[:400] if cont_text else "").replace("\n", "\\n")
-                            _dbg(f"[AGENT_DEBUG] Continuation content preview (first 400 chars): {cont_preview}")
+                            _dbg(lambda: "[AGENT_DEBUG] Continuation content preview (first 400 chars): "
+                                 + (cont_text[:400] if cont_text else "").replace("\n", "\\n"))
                             if cont_text and cont_text.strip():
-                                clean2 = _sanitize_output(cont_text, response_format)
-                                return clean2.strip() if clean2 and clean2.strip() else None
+                                return _sanitize_output(cont_text, response_format) or None
 
                 # No usable content
                 return None
 
             # Non-200: handle errors and retry where sensible
             last_err = payload if isinstance(payload, dict) else None
-            _dbg(f"[AGENT_DEBUG] OpenAI non-200 status={status}")
+            _dbg(lambda: f"[AGENT_DEBUG] OpenAI non-200 status={status}")
 
             if debug:
                 if isinstance(last_err, dict):
-                    _dbg(f"[AGENT_DEBUG] OpenAI error JSON: {last_err}")
+                    print(f"[AGENT_DEBUG] OpenAI error JSON: {last_err}")
                 elif last_raw_text:
-                    _dbg(f"[AGENT_DEBUG] OpenAI error text: {last_raw_text[:2000]}")
+                    print(f"[AGENT_DEBUG] OpenAI error text: {last_raw_text[:2000]}")
 
             # Parse error fields
             err = (last_err or {}).get("error") if isinstance(last_err, dict) else None
@@ -539,8 +1140,7 @@ def call_openai(prompt: str, api_key: str, response_format: str = "diff") -> Opt
                 _dbg("[AGENT_DEBUG] Model rejected temperature; removing temperature and retrying.")
                 data.pop("temperature", None)
                 if attempt < retries:
-                    time.sleep(backoff_s)
-                    backoff_s = min(backoff_s * 2, 30)
+                    _backoff()
                     continue
 
             # Auto-fix verbosity problems: remove verbosity key entirely if rejected
@@ -549,32 +1149,70 @@ def call_openai(prompt: str, api_key: str, response_format: str = "diff") -> Opt
                     _dbg("[AGENT_DEBUG] Model rejected text.verbosity; removing verbosity and retrying.")
                     data["text"].pop("verbosity", None)
                     if attempt < retries:
-                        time.sleep(backoff_s)
-                        backoff_s = min(backoff_s * 2, 30)
+                        _backoff()
                         continue
 
             # Retry on transient status codes
-            if status in (429, 500, 502, 503, 504) and attempt < retries:
-                time.sleep(backoff_s)
-                backoff_s = min(backoff_s * 2, 30)
-                continue
+            if status in (429, 500, 502, 503, 504):
+                if breaker:
+                    _breaker_record(ok=False)
+                if attempt < retries:
+                    _backoff()
+                    continue
 
             return None
 
+        except _BudgetExhausted:
+            print(f"OpenAI call exceeded its {budget_s}s budget (OPENAI_TOTAL_BUDGET_S); giving up.")
+            return None
+
         except requests.exceptions.ReadTimeout as e:
-            _dbg(f"[AGENT_DEBUG] OpenAI ReadTimeout: {e}")
+            if debug:
+                print(f"[AGENT_DEBUG] OpenAI ReadTimeout: {e}")
+            if breaker:
+                _breaker_record(ok=False)
             if attempt < retries:
-                time.sleep(backoff_s)
-                backoff_s = min(backoff_s * 2, 30)
+                _backoff()
                 continue
             return None
 
         except Exception as e:
-            _dbg(f"[AGENT_DEBUG] OpenAI API exception: {type(e).__name__}: {e}")
+            if debug:
+                print(f"[AGENT_DEBUG] OpenAI API exception: {type(e).__name__}: {e}")
+            if breaker:
+                _breaker_record(ok=False)
             if attempt < retries:
-                time.sleep(backoff_s)
-                backoff_s = min(backoff_s * 2, 30)
+                _backoff()
                 continue
             return None
 
-    return None
\ No newline at end of file
+    return None
+
+
+# Caps requests in flight from call_openai_async (OPENAI_CONCURRENCY, default 4;
+# the session pool is sized to match). Created on first use, after .env loading.
+_CONCURRENCY: Optional[threading.BoundedSemaphore] = None
+
+
+def _concurrency() -> threading.BoundedSemaphore:
+    global _CONCURRENCY
+    with _SESSIONS_LOCK:
+        if _CONCURRENCY is None:
+            _CONCURRENCY = threading.BoundedSemaphore(max(1, _env_int("OPENAI_CONCURRENCY", 4)))
+    return _CONCURRENCY
+
+
+def _call_openai_bounded(prompt: Prompt, api_key: str, response_format: str) -> Optional[str]:
+    with _concurrency():
+        return call_openai(prompt, api_key, response_format)
+
+
+async def call_openai_async(prompt: Prompt, api_key: str, response_format: str = "diff") -> Optional[str]:
+    """
+    Async variant of call_openai, run on a worker thread over the shared session.
+
+    Lets independent prompts be in flight together, at most OPENAI_CONCURRENCY
+    at a time, e.g.
+        results = await asyncio.gather(*(call_openai_async(p, key) for p in prompts))
+    """
+    return await asyncio.to_thread(_call_openai_bounded, prompt, api_key, response_format)
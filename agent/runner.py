@@ -67,12 +67,12 @@ class Runner:
             try:
                 # Use LLM analysis if API key is available (hybrid approach)
                 use_llm = bool(self.config.openai_api_key)
-                generator = KnowledgeBaseGenerator(
+                with KnowledgeBaseGenerator(
                     str(self.repo_path),
                     openai_api_key=self.config.openai_api_key if use_llm else None,
                     use_llm_analysis=use_llm
-                )
-                self._knowledge_base = generator.generate()
+                ) as generator:
+                    self._knowledge_base = generator.generate()
                 # Optionally save it (but don't commit - it's generated)
                 if self._debug_enabled():
                     llm_status = "with LLM semantic analysis" if use_llm else "structure-only"
@@ -169,18 +169,28 @@ class Runner:
             return []
 
         for check in self.config.truth_checks:
+            if not check.command:
+                failing.append(
+                    {
+                        "name": check.name,
+                        "command": "",
+                        "error": "No command configured for this truth check",
+                        "output": "",
+                    }
+                )
+                continue
             try:
                 result = self._run_cmd(
-                    check["command"],
+                    check.command,
                     cwd=app_path,
                     timeout=300,
-                    label=check.get("name", "truth-check"),
+                    label=check.name,
                 )
                 if result.returncode != 0:
                     failing.append(
                         {
-                            "name": check["name"],
-                            "command": check["command"],
+                            "name": check.name,
+                            "command": check.command,
                             "error": (result.stderr or "")[:500],
                             "output": (result.stdout or "")[:500],
                         }
@@ -188,8 +198,8 @@ class Runner:
             except subprocess.TimeoutExpired:
                 failing.append(
                     {
-                        "name": check["name"],
-                        "command": check["command"],
+                        "name": check.name,
+                        "command": check.command,
                         "error": "Command timed out",
                         "output": "",
                     }
@@ -197,8 +207,8 @@ class Runner:
             except Exception as e:
                 failing.append(
                     {
-                        "name": check["name"],
-                        "command": check["command"],
+                        "name": check.name,
+                        "command": check.command,
                         "error": str(e),
                         "output": "",
                     }
@@ -766,7 +776,7 @@ class Runner:
         self._run_cmd(["git", "commit", "-m", "fix: resolve failing truth checks"], cwd=self.repo_path, timeout=60, label="git commit")
         self._run_cmd(["git", "push", "-u", "origin", branch_name], cwd=self.repo_path, timeout=120, label="git push")
 
-        check_outputs = "\n".join([f"- {check['name']}: ✅ PASS" for check in self.config.truth_checks])
+        check_outputs = "\n".join([f"- {check.name}: ✅ PASS" for check in self.config.truth_checks])
 
         pr_body = f"""## Summary
 Fixed failing truth checks in the repository.
@@ -801,7 +811,7 @@ See diff for details.
 
     def run_milestone_mode(self) -> Optional[str]:
         """Run in milestone mode - complete next todo milestone."""
-        milestone = get_next_todo_milestone(self.config.milestones)
+        milestone = get_next_todo_milestone(self.config.milestone_index)
         if not milestone:
             print("No todo milestones found")
             return None
@@ -814,7 +824,7 @@ See diff for details.
         milestone["attempts"] = attempts
         if attempts > self.config.max_attempts:
             update_milestone_status(
-                self.config.milestones,
+                self.config.milestone_index,
                 milestone_id,
                 "blocked",
                 f"Exceeded max_attempts ({self.config.max_attempts})",
@@ -823,22 +833,21 @@ See diff for details.
             print(f"Milestone {milestone_id} blocked due to exceeding max attempts")
             return None
 
-        update_milestone_status(self.config.milestones, milestone_id, "in_progress")
+        update_milestone_status(self.config.milestone_index, milestone_id, "in_progress")
         self.config.save()
 
         # Gather context for the LLM using knowledge base + targeted file reading
         current_files_snippet: Optional[str] = None
+        kb_content: Optional[str] = None
         try:
             if self.repo_path:
                 context_parts: List[str] = []
                 
-                # 0. Load knowledge base (comprehensive codebase understanding)
+                # 0. Load knowledge base (comprehensive codebase understanding).
+                # Passed to the prompt builder separately: it goes ahead of the
+                # milestone-specific text so the prompt cache can cover it.
                 kb_content = self._load_knowledge_base()
                 if kb_content:
-                    context_parts.append("=== KNOWLEDGE BASE (Complete Codebase Understanding) ===")
-                    context_parts.append(kb_content)
-                    context_parts.append("=== END KNOWLEDGE BASE ===\n")
-                    
                     # When KB is available, skip redundant structure gathering
                     # KB already has: structure, file catalog, patterns, navigation
                     # We only need: target files to modify
@@ -1073,6 +1082,7 @@ See diff for details.
             self.config.max_files,
             self.config.max_lines,
             current_files=current_files_snippet,
+            knowledge_base=kb_content,
         )
 
         print("Calling OpenAI API for milestone patch...")
@@ -1084,14 +1094,14 @@ See diff for details.
                 print("=== OpenAI exception (milestone mode) ===")
                 traceback.print_exc()
 
-            update_milestone_status(self.config.milestones, milestone_id, "blocked", f"OpenAI exception: {type(e).__name__}: {e}")
+            update_milestone_status(self.config.milestone_index, milestone_id, "blocked", f"OpenAI exception: {type(e).__name__}: {e}")
             self.config.save()
             self._fail(f"OpenAI exception in milestone mode: {type(e).__name__}: {e}")
             return None
 
         if not patch:
             print("Failed to generate patch (empty response in milestone mode)")
-            update_milestone_status(self.config.milestones, milestone_id, "blocked", "Failed to generate patch: empty response from call_openai")
+            update_milestone_status(self.config.milestone_index, milestone_id, "blocked", "Failed to generate patch: empty response from call_openai")
             self.config.save()
             self._fail("OpenAI returned empty patch in milestone mode")
             return None
@@ -1100,7 +1110,7 @@ See diff for details.
         if patch.strip() == "NO_PATCH":
             print("Model declined to generate patch (NO_PATCH response)")
             update_milestone_status(
-                self.config.milestones,
+                self.config.milestone_index,
                 milestone_id,
                 "blocked",
                 "Model unable to safely generate a patch - insufficient context or unclear requirements"
@@ -1127,13 +1137,13 @@ See diff for details.
                     validation_error = self._validate_milestone_patch(pr_diff, milestone)
                     if not validation_error:
                         print(f"Existing PR appears to satisfy milestone; marking as done: {existing_pr.get('html_url')}")
-                        update_milestone_status(self.config.milestones, milestone_id, "done")
+                        update_milestone_status(self.config.milestone_index, milestone_id, "done")
                         self.config.save()
                         return existing_pr.get("html_url")
                     print(f"Existing PR did not satisfy milestone; continuing: {validation_error}")
 
         if not self._ensure_branch_checked_out(branch_name, self.config.default_branch):
-            update_milestone_status(self.config.milestones, milestone_id, "blocked", f"Failed to prepare branch {branch_name}")
+            update_milestone_status(self.config.milestone_index, milestone_id, "blocked", f"Failed to prepare branch {branch_name}")
             self.config.save()
             self._fail(f"Failed to prepare branch {branch_name} in milestone mode")
             return None
@@ -1182,18 +1192,19 @@ See diff for details.
                                 pass
             
             # Retry with enhanced prompt
-            retry_prompt = prompt + retry_instructions
+            system_part, user_part = prompt
+            retry_prompt = (system_part, user_part + retry_instructions)
             try:
                 retry_patch = call_openai(retry_prompt, self.config.openai_api_key, response_format="file")
             except Exception as e:
                 print(f"Retry failed with exception: {e}")
-                update_milestone_status(self.config.milestones, milestone_id, "blocked", f"{validation_error} (retry also failed)")
+                update_milestone_status(self.config.milestone_index, milestone_id, "blocked", f"{validation_error} (retry also failed)")
                 self.config.save()
                 self._fail(f"Patch validation failed before applying: {validation_error}")
                 return None
             
             if not retry_patch:
-                update_milestone_status(self.config.milestones, milestone_id, "blocked", f"{validation_error} (retry returned empty)")
+                update_milestone_status(self.config.milestone_index, milestone_id, "blocked", f"{validation_error} (retry returned empty)")
                 self.config.save()
                 self._fail(f"Patch validation failed before applying: {validation_error}")
                 return None
@@ -1201,7 +1212,7 @@ See diff for details.
             # Validate the retry patch
             retry_validation_error, _ = self._validate_milestone_patch_before_apply(retry_patch, milestone, self.repo_path)
             if retry_validation_error:
-                update_milestone_status(self.config.milestones, milestone_id, "blocked", f"{validation_error} (retry also failed: {retry_validation_error})")
+                update_milestone_status(self.config.milestone_index, milestone_id, "blocked", f"{validation_error} (retry also failed: {retry_validation_error})")
                 self.config.save()
                 self._fail(f"Patch validation failed after retry: {retry_validation_error}")
                 return None
@@ -1272,7 +1283,7 @@ See diff for details.
                 if not matches:
                     # None of the files in the patch are in the allowed target_files
                     update_milestone_status(
-                        self.config.milestones,
+                        self.config.milestone_index,
                         milestone_id,
                         "blocked",
                         f"Patch touches files outside target_files: {list(patch_file_paths)[:3]}. Must only modify files matching {milestone['target_files']}"
@@ -1292,7 +1303,7 @@ See diff for details.
                     "Unified diff format with line numbers is not supported and causes corrupt patch errors."
                 )
                 update_milestone_status(
-                    self.config.milestones,
+                    self.config.milestone_index,
                     milestone_id,
                     "blocked",
                     error_msg
@@ -1307,7 +1318,7 @@ See diff for details.
 
         success, error = self.apply_patch(actual_patch, self.repo_path)
         if not success:
-            update_milestone_status(self.config.milestones, milestone_id, "blocked", f"Patch apply failed: {error}")
+            update_milestone_status(self.config.milestone_index, milestone_id, "blocked", f"Patch apply failed: {error}")
             self.config.save()
             self._fail(f"Patch apply failed in milestone mode: {error}")
             return None
@@ -1315,7 +1326,7 @@ See diff for details.
         # Validate that patch actually addresses milestone requirements
         validation_error = self._validate_milestone_patch(actual_patch, milestone)
         if validation_error:
-            update_milestone_status(self.config.milestones, milestone_id, "blocked", validation_error)
+            update_milestone_status(self.config.milestone_index, milestone_id, "blocked", validation_error)
             self.config.save()
             self._fail(f"Patch validation failed: {validation_error}")
             return None
@@ -1391,7 +1402,7 @@ See diff for details.
             result = self._run_cmd(cmd, cwd=app_path, timeout=300, label=f"acceptance: {cmd}")
             if result.returncode != 0:
                 reason = f"Acceptance failed: {cmd}\nSTDOUT:\n{(result.stdout or '')[:500]}\nSTDERR:\n{(result.stderr or '')[:500]}"
-                update_milestone_status(self.config.milestones, milestone_id, "blocked", reason)
+                update_milestone_status(self.config.milestone_index, milestone_id, "blocked", reason)
                 self.config.save()
                 self._fail("Acceptance criteria not met in milestone mode")
                 return None
@@ -1428,7 +1439,7 @@ See diff for details.
 
         if pr:
             print(f"Created PR: {pr['html_url']}")
-            update_milestone_status(self.config.milestones, milestone_id, "done")
+            update_milestone_status(self.config.milestone_index, milestone_id, "done")
             self.config.save()
             return pr["html_url"]
 
@@ -1450,7 +1461,7 @@ See diff for details.
                 return self.run_fix_mode()
 
         if mode in ("milestone", "auto"):
-            milestone = get_next_todo_milestone(self.config.milestones)
+            milestone = get_next_todo_milestone(self.config.milestone_index)
             if milestone:
                 result = self.run_milestone_mode()
                 if result and milestone.get("stop_feature"):
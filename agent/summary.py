@@ -24,10 +24,10 @@ def generate_daily_summary(
     health = "🔴 RED" if failing_checks else "🟢 GREEN"
     
     # Get milestone statuses
-    todo_milestones = get_milestones_by_status(config.milestones, "todo")
-    in_progress_milestones = get_milestones_by_status(config.milestones, "in_progress")
-    done_milestones = get_milestones_by_status(config.milestones, "done")
-    blocked_milestones = get_milestones_by_status(config.milestones, "blocked")
+    todo_milestones = get_milestones_by_status(config.milestone_index, "todo")
+    in_progress_milestones = get_milestones_by_status(config.milestone_index, "in_progress")
+    done_milestones = get_milestones_by_status(config.milestone_index, "done")
+    blocked_milestones = get_milestones_by_status(config.milestone_index, "blocked")
     
     # Format PR links
     pr_links = "\n".join([f"- {pr}" for pr in prs_created]) if prs_created else "- None"
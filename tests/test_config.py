@@ -0,0 +1,35 @@
+"""Tests for agent.config."""
+
+from agent.config import Config, TruthCheck
+
+
+def test_load_yaml_sees_rewritten_file(tmp_path):
+    path = tmp_path / "reclaim.yaml"
+    path.write_text("max_files: 3\n", encoding="utf-8")
+    assert Config._load_yaml(path) == {"max_files": 3}
+    path.write_text("max_files: 12\n", encoding="utf-8")
+    assert Config._load_yaml(path) == {"max_files": 12}
+
+
+def test_load_yaml_returns_a_copy(tmp_path):
+    path = tmp_path / "reclaim.yaml"
+    path.write_text("repo_rules:\n  - a\n", encoding="utf-8")
+    Config._load_yaml(path)["repo_rules"].append("b")
+    assert Config._load_yaml(path) == {"repo_rules": ["a"]}
+
+
+def test_truth_check_without_command_still_loads():
+    assert TruthCheck.from_dict({"name": "lint"}) == TruthCheck(name="lint", command="")
+
+
+def test_merged_sidecar_skipped_when_json_would_change_keys(tmp_path):
+    path = tmp_path / "merged.test.json"
+    Config._write_merged_cache(path, {"ports": {8080: "app"}})
+    assert not path.exists()
+    Config._write_merged_cache(path, {"ports": {"8080": "app"}})
+    assert Config._load_merged_cache(path) == {"ports": {"8080": "app"}}
+
+
+def test_merged_sidecar_lives_outside_agent_config(tmp_path):
+    default_path, reclaim_path = tmp_path / "default.yaml", tmp_path / "reclaim.yaml"
+    assert Config._merged_cache_path(default_path, reclaim_path).parent != reclaim_path.parent
@@ -0,0 +1,44 @@
+"""Tests for agent.github_api."""
+
+from agent.github_api import GitHubAPI
+
+
+def _api(search_status, search_body, issues):
+    """A client whose GETs are answered from canned search/listing responses."""
+    api = GitHubAPI.__new__(GitHubAPI)
+    api.base_url = "https://api.github.com"
+    api.repo = "owner/repo"
+    api.calls = []
+
+    def get_json(url, params=None):
+        api.calls.append(url)
+        if url.endswith("/search/issues"):
+            return search_status, search_body
+        return 200, issues
+
+    api._get_json = get_json
+    return api
+
+
+def test_issue_found_by_listing_when_search_is_empty():
+    # Search index lag: the issue exists but search doesn't see it yet.
+    api = _api(200, {"items": []}, [{"title": "Agent status", "number": 7}])
+    assert api.get_issue_by_title("Agent status")["number"] == 7
+    assert len(api.calls) == 2
+
+
+def test_issue_found_by_listing_when_search_has_only_fuzzy_hits():
+    api = _api(200, {"items": [{"title": "Agent status (old)", "number": 1}]},
+               [{"title": "Agent status", "number": 7}])
+    assert api.get_issue_by_title("Agent status")["number"] == 7
+
+
+def test_exact_search_hit_skips_listing():
+    api = _api(200, {"items": [{"title": "Agent status", "number": 3}]}, [])
+    assert api.get_issue_by_title("Agent status")["number"] == 3
+    assert len(api.calls) == 1
+
+
+def test_missing_issue_returns_none():
+    api = _api(403, None, [{"title": "Other", "number": 1}])
+    assert api.get_issue_by_title("Agent status") is None
@@ -0,0 +1,120 @@
+"""Tests for agent.prompts."""
+
+import json
+from pathlib import Path
+
+import yaml
+
+from agent import prompts
+from agent.prompts import _env_int, build_fix_prompt, build_milestone_prompt, reload_env
+
+# Unquoted "key: value" rules (as in agent_config/reclaim.yaml) load as dicts.
+_RULES = yaml.safe_load(
+    """
+repo_rules:
+  - Never force push to branches
+  - For UUID PK tables: omit id and let DB generate it
+"""
+)["repo_rules"]
+
+
+def test_rules_yaml_dict_rule_is_rendered():
+    assert isinstance(_RULES[1], dict)
+    for _ in range(2):  # second call is served from the rules cache
+        _, user = build_fix_prompt([{"name": "tsc", "error": "boom"}], _RULES, 3, 150)
+        assert "- Never force push to branches" in user
+        assert "For UUID PK tables" in user
+
+
+def test_milestone_prompt_accepts_yaml_dict_rule():
+    milestone = {"title": "Add preview", "acceptance": ["cd app && npm ci"]}
+    _, user = build_milestone_prompt(milestone, _RULES, 3, 150)
+    assert "For UUID PK tables" in user
+
+
+def test_reload_env_picks_up_changed_settings(monkeypatch):
+    monkeypatch.setenv("OPENAI_RETRIES", "2")
+    reload_env()
+    assert _env_int("OPENAI_RETRIES", 3) == 2
+    monkeypatch.setenv("OPENAI_RETRIES", "5")
+    assert _env_int("OPENAI_RETRIES", 3) == 2  # memoized until reloaded
+    reload_env()
+    assert _env_int("OPENAI_RETRIES", 3) == 5
+    monkeypatch.delenv("OPENAI_RETRIES")
+    reload_env()
+
+
+def test_disk_cache_hit_survives_concurrent_eviction(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_CACHE_ENABLED", "1")
+    monkeypatch.setenv("OPENAI_CACHE_DIR", str(tmp_path))
+    reload_env()
+    try:
+        key = prompts._cache_key("gpt-4.1", "hi", "diff")
+        path = tmp_path / f"{key}.txt"
+        path.write_text("cached diff", encoding="utf-8")
+
+        read_text = Path.read_text
+
+        def read_then_evict(self, *args, **kwargs):
+            text = read_text(self, *args, **kwargs)
+            self.unlink()  # another process's TTL eviction
+            return text
+
+        monkeypatch.setattr(Path, "read_text", read_then_evict)
+        prompts._RESPONSE_CACHE.pop(key, None)
+        assert prompts.call_openai("hi", "test-key") == "cached diff"
+        assert prompts._RESPONSE_CACHE[key][1] == "cached diff"
+    finally:
+        monkeypatch.delenv("OPENAI_CACHE_ENABLED")
+        monkeypatch.delenv("OPENAI_CACHE_DIR")
+        reload_env()
+
+
+class _FakeResponse:
+    status_code = 200
+    headers = {"Content-Type": "application/json"}
+
+    def __init__(self, payload):
+        self.content = json.dumps(payload).encode()
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class _RecordingSession:
+    """Stands in for the requests session; answers every post with a complete file block."""
+
+    def __init__(self):
+        self.bodies = []
+
+    def post(self, url, data=None, **kwargs):
+        self.bodies.append(json.loads(data))
+        return _FakeResponse({"status": "completed", "output_text": "===FILE_START: a.ts===\nx\n===FILE_END: a.ts==="})
+
+
+def _first_file_mode_budget(monkeypatch, prompt):
+    for name in ("OPENAI_MAX_OUTPUT_TOKENS", "OPENAI_CACHE_ENABLED"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("OPENAI_STREAM", "0")
+    reload_env()
+    session = _RecordingSession()
+    monkeypatch.setitem(prompts._SESSIONS, "test-key", session)
+    try:
+        assert prompts.call_openai(prompt, "test-key", response_format="file")
+    finally:
+        monkeypatch.delenv("OPENAI_STREAM")
+        reload_env()
+    return session.bodies[0]["max_output_tokens"]
+
+
+_MILESTONE = {"title": "Add preview", "acceptance": ["cd app && npm ci"], "target_files": ["app/src/*.ts"]}
+
+
+def test_file_mode_budget_ignores_knowledge_base(monkeypatch):
+    prompt = build_milestone_prompt(_MILESTONE, _RULES, 3, 150, current_files="small", knowledge_base="k" * 400_000)
+    assert _first_file_mode_budget(monkeypatch, prompt) == 4000
+
+
+def test_file_mode_budget_grows_with_target_files(monkeypatch):
+    prompt = build_milestone_prompt(_MILESTONE, _RULES, 3, 150, current_files="f" * 40_000, knowledge_base="k" * 400_000)
+    assert 10_000 < _first_file_mode_budget(monkeypatch, prompt) < 12_000